@@ -15,6 +15,7 @@ from mcp_servers.google_drive_server import GoogleDriveServer
 from mcp_servers.google_calendar_server import GoogleCalendarServer
 from mcp_servers.notion_server import NotionServer
 from mcp_servers.slack_server import SlackServer
+from mcp_servers.slack_mcp import shutdown as shutdown_slack_session
 
 from tools.tool_registry import tool_registry
 from rag.vector_store import VectorStore, EmbeddingModel
@@ -216,6 +217,9 @@ async def main():
     except Exception as e:
         print(f"실행 중 오류 발생: {e}")
         return 1
+    finally:
+        # 공유 Slack HTTP 세션 정리
+        await shutdown_slack_session()
 
     return 0
 
@@ -8,6 +8,23 @@ from typing import Dict, Any, List, Optional
 import asyncio
 import aiohttp
 import json
+from cachetools import TTLCache
+
+# 검색 결과 캐시 유지 시간(초)
+NOTION_CACHE_TTL = float(os.getenv("NOTION_CACHE_TTL", "60"))
+# 검색 결과 캐시 최대 항목 수 (초과 시 오래된 항목부터 제거)
+NOTION_CACHE_SIZE = int(os.getenv("NOTION_CACHE_SIZE", "1024"))
+
+_MISS = object()
+
+
+def _freeze(o):
+    """dict/list 요청 데이터를 해시 가능한 튜플 키로 변환 (JSON 직렬화 없이)"""
+    if isinstance(o, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in o.items()))
+    if isinstance(o, list):
+        return tuple(map(_freeze, o))
+    return o
 
 
 class NotionMCP:
@@ -19,6 +36,37 @@ class NotionMCP:
         self.connected = False
         self.base_url = "https://api.notion.com/v1"
         self.session = None
+        # (method, _freeze(data)) → 결과 (TTL 만료 + 크기 상한으로 자동 제거)
+        self._cache = TTLCache(maxsize=NOTION_CACHE_SIZE, ttl=NOTION_CACHE_TTL)
+        # 동일 요청 동시 호출 병합용 (method, _freeze(data)) → Future
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+
+    async def _cached_call(self, method: str, data: Dict[str, Any], fetch):
+        """TTL 캐시 + 진행 중 요청 병합 헬퍼"""
+        key = (method, _freeze(data or {}))
+
+        hit = self._cache.get(key, _MISS)
+        if hit is not _MISS:
+            return hit
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+            self._cache[key] = result
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            # 대기자가 없으면 예외 미조회 경고가 뜨지 않도록 소비
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
 
     async def connect(self) -> bool:
         """MCP 서버 연결"""
@@ -63,6 +111,7 @@ class NotionMCP:
     async def disconnect(self):
         """MCP 서버 연결 해제"""
         self.connected = False
+        self._cache.clear()
         if self.session:
             await self.session.close()
             self.session = None
@@ -203,14 +252,17 @@ class NotionMCP:
             if filter_type:
                 data["filter"] = {"value": filter_type, "property": "object"}
 
-            async with self.session.post(
-                f"{self.base_url}/search", headers=headers, json=data
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result.get("results", [])
-                else:
-                    raise Exception(f"HTTP {response.status}")
+            async def fetch():
+                async with self.session.post(
+                    f"{self.base_url}/search", headers=headers, json=data
+                ) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        return result.get("results", [])
+                    else:
+                        raise Exception(f"HTTP {response.status}")
+
+            return await self._cached_call("search", data, fetch)
 
         except Exception as e:
             raise Exception(f"Notion 검색 중 오류: {e}")
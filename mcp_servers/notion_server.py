@@ -0,0 +1,8 @@
+"""
+Notion MCP 서버 호환 모듈
+기존 NotionServer 임포트 경로를 실제 구현(NotionMCP)으로 연결합니다.
+"""
+
+from .notion_mcp import NotionMCP as NotionServer
+
+__all__ = ["NotionServer"]
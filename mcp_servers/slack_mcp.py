@@ -4,10 +4,207 @@ Slack MCP 서버 연결 모듈
 """
 
 import os
+import time
+import zlib
+from itertools import islice
 from typing import Dict, Any, List, Optional
 import asyncio
+import aiofiles
 import aiohttp
+from cachetools import TTLCache
 import json
+import orjson
+
+__all__ = ["SlackMCP", "SlackError", "SlackAPIError", "SlackNotConnected"]
+
+# 유휴 상태가 이 시간(초)을 넘으면 auth.test로 소켓을 깨워 LB idle timeout 방지
+SLACK_KEEPALIVE_INTERVAL = float(os.getenv("SLACK_KEEPALIVE_INTERVAL", "60"))
+
+# conversations.invite 한 번에 보낼 수 있는 최대 사용자 수
+SLACK_INVITE_BATCH_SIZE = 1000
+
+# 메서드별 동시 호출 상한이 없을 때 적용되는 인스턴스당 기본 동시 호출 수
+SLACK_MAX_CONCURRENCY = int(os.getenv("SLACK_MAX_CONCURRENCY", "10"))
+
+# rate limit이 빡빡한 메서드의 동시 호출 상한
+# (chat.postMessage는 채널당 초당 1건, conversations.history는 Tier 3)
+_METHOD_CONCURRENCY = {
+    "chat.postMessage": 1,
+    "conversations.history": 2,
+}
+
+# 요청 본문이 이 크기(바이트) 이상이면 gzip 압축 전송 (0이면 비활성)
+SLACK_GZIP_MIN_BYTES = int(os.getenv("SLACK_GZIP_MIN_BYTES", "0"))
+
+# 429/5xx 응답 시 최대 재시도 횟수
+SLACK_MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "3"))
+_RETRYABLE_STATUS = (500, 502, 503, 504)
+# 5xx를 재시도해도 안전한(조회 전용) 메서드 - 그 밖의 메서드는 Slack이 이미 처리했을 수 있어
+# 중복 게시/생성/초대를 막기 위해 Retry-After가 붙은 503만 재시도
+_READ_ONLY_SUFFIXES = ("list", "history", "info", "replies")
+
+
+def _is_read_only(method: str) -> bool:
+    return method == "auth.test" or method.rsplit(".", 1)[-1] in _READ_ONLY_SUFFIXES
+
+# 같은 채널로 짧은 간격에 들어온 텍스트 메시지를 하나로 합쳐 보내는 대기 시간(ms)
+# 0이면 비활성 (합치면 여러 호출이 같은 메시지 ts를 공유하므로 기본은 꺼둠)
+SLACK_COALESCE_WINDOW = float(os.getenv("SLACK_COALESCE_MS", "0")) / 1000
+
+# 채널/사용자 메타데이터 캐시 유지 시간(초)
+SLACK_CACHE_TTL = float(os.getenv("SLACK_CACHE_TTL", "300"))
+
+# list_channels(fields=...)에서 사용하는 필드별 추출기
+_CHANNEL_FIELDS = {
+    "id": lambda c: c["id"],
+    "name": lambda c: c["name"],
+    "is_private": lambda c: c.get("is_private", False),
+    "members": lambda c: c.get("num_members", 0),
+    "purpose": lambda c: (c.get("purpose") or {}).get("value", ""),
+    "topic": lambda c: (c.get("topic") or {}).get("value", ""),
+    "created": lambda c: c.get("created", 0),
+}
+
+# aiodns 사용 시 지정할 네임서버 (콤마 구분, 비우면 시스템 설정 사용)
+SLACK_DNS_NAMESERVERS = [
+    ns.strip() for ns in os.getenv("SLACK_DNS_NAMESERVERS", "").split(",") if ns.strip()
+]
+
+# 1이면 v2 업로드 흐름 대신 레거시 files.upload로 파일 전송 (v2 미지원 워크스페이스용)
+SLACK_LEGACY_UPLOAD = os.getenv("SLACK_LEGACY_UPLOAD", "0") == "1"
+
+# 1이면 Web API 호출에 httpx HTTP/2 클라이언트 사용 (httpx[http2] 필요)
+# 한 커넥션에서 요청을 멀티플렉싱하고 HPACK으로 반복 헤더를 압축
+SLACK_HTTP2 = os.getenv("SLACK_HTTP2", "0") == "1"
+
+# 프로세스 전역에서 공유하는 HTTP 세션 (keep-alive 커넥션 재사용)
+_SESSION: Optional[aiohttp.ClientSession] = None
+_SESSION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_HTTP2_CLIENT = None
+_HTTP2_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# 연결된 인스턴스들의 keepalive 태스크 (shutdown()에서 함께 취소)
+_KEEPALIVE_TASKS: set = set()
+
+
+def _build_resolver() -> aiohttp.abc.AbstractResolver:
+    """aiodns가 있으면 비동기 리졸버, 없으면 스레드풀 기반 기본 리졸버"""
+    try:
+        import aiodns  # noqa: F401
+    except ImportError:
+        return aiohttp.ThreadedResolver()
+    if SLACK_DNS_NAMESERVERS:
+        return aiohttp.AsyncResolver(nameservers=SLACK_DNS_NAMESERVERS)
+    return aiohttp.AsyncResolver()
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """공유 ClientSession을 지연 생성하여 반환"""
+    global _SESSION, _SESSION_LOOP
+    loop = asyncio.get_running_loop()
+    # 닫혔거나 다른 이벤트 루프에서 만든 세션은 재사용할 수 없음
+    if _SESSION is None or _SESSION.closed or _SESSION_LOOP is not loop:
+        _SESSION_LOOP = loop
+        _SESSION = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                resolver=_build_resolver(),
+                limit=200,
+                limit_per_host=64,
+                use_dns_cache=True,
+                ttl_dns_cache=600,
+                keepalive_timeout=120,
+                force_close=False,
+                enable_cleanup_closed=True,
+            ),
+            headers={
+                "Connection": "keep-alive",
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+            },
+            auto_decompress=True,
+            read_bufsize=64 * 1024,
+            # json= 인자를 쓰는 호출도 orjson으로 직렬화
+            json_serialize=lambda o: orjson.dumps(o).decode(),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _SESSION
+
+
+async def get_http2_client():
+    """공유 httpx HTTP/2 클라이언트를 지연 생성하여 반환"""
+    global _HTTP2_CLIENT, _HTTP2_LOOP
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _HTTP2_CLIENT is None or _HTTP2_CLIENT.is_closed or _HTTP2_LOOP is not loop:
+        _HTTP2_LOOP = loop
+        _HTTP2_CLIENT = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={"Accept": "application/json"},
+            timeout=30.0,
+        )
+    return _HTTP2_CLIENT
+
+
+async def _iter_file_chunks(file_path: str, chunk_size: int = 64 * 1024):
+    """파일을 고정 크기 청크로 비동기 스트리밍"""
+    async with aiofiles.open(file_path, "rb") as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
+
+
+async def shutdown():
+    """keepalive 태스크 취소 후 공유 세션 종료 (프로세스 종료 시 한 번 호출)
+
+    keepalive가 살아 있으면 세션을 닫은 뒤에도 get_session()으로 새 세션을 만들어 버리므로 먼저 취소
+    """
+    global _SESSION, _SESSION_LOOP, _HTTP2_CLIENT, _HTTP2_LOOP
+    tasks = list(_KEEPALIVE_TASKS)
+    _KEEPALIVE_TASKS.clear()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    if _HTTP2_CLIENT is not None and not _HTTP2_CLIENT.is_closed:
+        await _HTTP2_CLIENT.aclose()
+    _SESSION = None
+    _SESSION_LOOP = None
+    _HTTP2_CLIENT = None
+    _HTTP2_LOOP = None
+
+
+class SlackError(Exception):
+    """Slack 연동 오류의 기본 클래스"""
+
+
+class SlackNotConnected(SlackError):
+    """connect() 이전에 API를 호출한 경우"""
+
+    def __init__(self, message: str = "연결되지 않음"):
+        super().__init__(message)
+
+
+class SlackAPIError(SlackError):
+    """Slack API가 ok=False로 응답한 경우
+
+    error: Slack 오류 코드 (예: channel_not_found)
+    response: Slack 응답 본문 전체 (사용자별 errors 등 확인용)
+    """
+
+    def __init__(
+        self,
+        error: str,
+        method: str = None,
+        payload: Dict[str, Any] = None,
+        response: Dict[str, Any] = None,
+        message: str = None,
+    ):
+        super().__init__(message or f"{method} 실패: {error}")
+        self.error = error
+        self.method = method
+        self.payload = payload
+        self.response = response or {}
 
 
 class SlackMCP:
@@ -18,6 +215,42 @@ class SlackMCP:
         self.client = None
         self.connected = False
         self.base_url = "https://slack.com/api"
+        # 요청마다 다시 만들지 않도록 헤더를 한 번만 구성
+        # (세션이 프로세스 공유라 토큰은 세션 기본 헤더에 넣을 수 없음)
+        self._form_headers = {"Authorization": f"Bearer {self.token}"}
+        self._headers = {**self._form_headers, "Content-Type": "application/json"}
+        self._last_call = 0.0
+        self._keepalive_task: Optional[asyncio.Task] = None
+        # 메서드별 세마포어 (목록에 없는 메서드는 "_default" 공유)
+        self._sem = {m: asyncio.Semaphore(n) for m, n in _METHOD_CONCURRENCY.items()}
+        self._sem["_default"] = asyncio.Semaphore(SLACK_MAX_CONCURRENCY)
+        # 자주 바뀌지 않는 메타데이터 캐시 (TTL 만료 + 크기 상한)
+        self._channel_cache = TTLCache(maxsize=16, ttl=SLACK_CACHE_TTL)
+        self._user_cache = TTLCache(maxsize=10_000, ttl=SLACK_CACHE_TTL)
+        # 채널별 합치기 대기열: channel → [(text, future)], channel → flush task
+        self._pending: Dict[str, List[tuple]] = {}
+        self._flush_task: Dict[str, asyncio.Task] = {}
+
+    async def _cached(self, cache: TTLCache, key: Any, fetch):
+        """캐시에 값이 있으면 반환, 없으면 fetch() 결과를 저장 후 반환"""
+        try:
+            return cache[key]
+        except KeyError:
+            pass
+        value = await fetch()
+        cache[key] = value
+        return value
+
+    async def _keepalive_loop(self):
+        """유휴 시 주기적으로 auth.test를 호출해 커넥션을 유지"""
+        while self.connected:
+            await asyncio.sleep(SLACK_KEEPALIVE_INTERVAL)
+            if time.monotonic() - self._last_call < SLACK_KEEPALIVE_INTERVAL:
+                continue
+            try:
+                await self._api_call("auth.test")
+            except Exception as e:
+                print(f"⚠️ Slack keepalive 실패: {e}")
 
     async def connect(self) -> bool:
         """MCP 서버 연결"""
@@ -29,75 +262,158 @@ class SlackMCP:
             print("Slack MCP 서버에 연결 중...")
 
             # 토큰 검증 (auth.test API 호출)
-            headers = {
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json",
-            }
-
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(
-                    f"{self.base_url}/auth.test", headers=headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get("ok"):
-                            self.connected = True
-                            print(
-                                f"✅ Slack MCP 서버 연결 성공 - 팀: {data.get('team', 'Unknown')}"
-                            )
-                            return True
-                        else:
-                            print(
-                                f"❌ Slack 인증 실패: {data.get('error', 'Unknown error')}"
+            session = await get_session()
+            async with session.get(
+                f"{self.base_url}/auth.test", headers=self._headers
+            ) as response:
+                if response.status == 200:
+                    data = orjson.loads(await response.read())
+                    if data.get("ok"):
+                        self.connected = True
+                        self._last_call = time.monotonic()
+                        if SLACK_KEEPALIVE_INTERVAL > 0 and self._keepalive_task is None:
+                            self._keepalive_task = asyncio.create_task(
+                                self._keepalive_loop()
                             )
-                            return False
+                            _KEEPALIVE_TASKS.add(self._keepalive_task)
+                        print(
+                            f"✅ Slack MCP 서버 연결 성공 - 팀: {data.get('team', 'Unknown')}"
+                        )
+                        return True
                     else:
-                        print(f"❌ Slack API 호출 실패: HTTP {response.status}")
+                        print(
+                            f"❌ Slack 인증 실패: {data.get('error', 'Unknown error')}"
+                        )
                         return False
+                else:
+                    print(f"❌ Slack API 호출 실패: HTTP {response.status}")
+                    return False
 
         except Exception as e:
             print(f"Slack 연결 실패: {e}")
             return False
 
     async def disconnect(self):
-        """MCP 서버 연결 해제"""
+        """MCP 서버 연결 해제 (공유 세션은 shutdown()에서 종료)"""
         self.connected = False
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            _KEEPALIVE_TASKS.discard(self._keepalive_task)
+            self._keepalive_task = None
         print("Slack MCP 서버 연결 해제")
 
     async def _api_call(
-        self, method: str, data: Dict[str, Any] = None
+        self, method: str, data: Dict[str, Any] = None, form: bool = False
     ) -> Dict[str, Any]:
-        """Slack API 호출 헬퍼 메서드"""
+        """Slack API 호출 헬퍼 메서드
+
+        form=True면 JSON 본문을 받지 않는 메서드용으로 form-urlencoded 전송
+        응답이 ok=False면 SlackAPIError를 발생시킵니다.
+        """
         if not self.connected:
-            raise Exception("연결되지 않음")
+            raise SlackNotConnected()
 
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json",
-        }
+        headers = self._form_headers if form else self._headers
 
         url = f"{self.base_url}/{method}"
 
-        try:
-            # 매번 새로운 세션을 사용하여 컨텍스트 문제 해결
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                if data:
-                    async with session.post(
-                        url, headers=headers, json=data
-                    ) as response:
-                        return await response.json()
+        body = None
+        if data:
+            body = data if form else orjson.dumps(data)
+            if not form and SLACK_GZIP_MIN_BYTES and len(body) >= SLACK_GZIP_MIN_BYTES:
+                body = zlib.compress(body, 1, wbits=31)  # gzip 포맷
+                headers = {**headers, "Content-Encoding": "gzip"}
+
+        sem = self._sem.get(method, self._sem["_default"])
+        for attempt in range(SLACK_MAX_RETRIES + 1):
+            async with sem:
+                self._last_call = time.monotonic()
+                status, retry_after, content = await self._send(url, headers, body)
+            if content is not None:
+                # str 디코딩 없이 바이트에서 바로 파싱
+                result = orjson.loads(content)
+                if not result.get("ok"):
+                    raise SlackAPIError(
+                        result.get("error", "Unknown error"),
+                        method=method,
+                        payload=data,
+                        response=result,
+                    )
+                return result
+
+            if attempt == SLACK_MAX_RETRIES:
+                raise SlackError(
+                    f"{method} 실패: HTTP {status} (재시도 {attempt}회 초과)"
+                )
+            # 429는 처리되지 않은 요청이므로 항상 재시도, 5xx는 조회 메서드 또는 Retry-After가 붙은 503만
+            if status != 429 and not (
+                _is_read_only(method) or (status == 503 and retry_after)
+            ):
+                raise SlackError(f"{method} 실패: HTTP {status} (중복 방지를 위해 재시도하지 않음)")
+
+            # 같은 세션으로 대기 후 재시도 (재연결 없음, 대기 중 슬롯 반납)
+            try:
+                delay = min(float(retry_after or ""), 30)
+            except ValueError:
+                delay = min(2**attempt, 30)
+            print(f"⚠️ Slack {method} HTTP {status} → {delay}초 후 재시도")
+            await asyncio.sleep(delay)
+
+    async def _send(self, url: str, headers: Dict[str, str], body: Any) -> tuple:
+        """설정된 HTTP 백엔드(aiohttp 또는 httpx HTTP/2)로 요청 전송
+
+        (status, Retry-After, 응답 바이트)를 반환합니다.
+        429/5xx는 재시도할 수 있도록 본문 없이 반환하고, 그 밖의 HTTP/전송 오류는 SlackError로 감싸 발생시킵니다.
+        """
+        if SLACK_HTTP2:
+            import httpx
+
+            client = await get_http2_client()
+            try:
+                if body is None:
+                    r = await client.get(url, headers=headers)
+                elif isinstance(body, dict):
+                    r = await client.post(url, headers=headers, data=body)
                 else:
-                    async with session.get(url, headers=headers) as response:
-                        return await response.json()
-        except Exception as e:
-            raise Exception(f"API 호출 실패: {e}")
+                    r = await client.post(url, headers=headers, content=body)
+                if r.status_code == 429 or r.status_code in _RETRYABLE_STATUS:
+                    return r.status_code, r.headers.get("Retry-After"), None
+                r.raise_for_status()
+                return r.status_code, None, r.content
+            except httpx.HTTPError as e:
+                raise SlackError(f"{url} 요청 실패: {type(e).__name__}: {e}") from e
+
+        session = await get_session()
+        if body is not None:
+            request = session.post(url, headers=headers, data=body)
+        else:
+            request = session.get(url, headers=headers)
+        try:
+            async with request as response:
+                if response.status == 429 or response.status in _RETRYABLE_STATUS:
+                    return response.status, response.headers.get("Retry-After"), None
+                response.raise_for_status()
+                return response.status, None, await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise SlackError(f"{url} 요청 실패: {type(e).__name__}: {e}") from e
+
+    async def bulk(self, calls: List[tuple]) -> List[Any]:
+        """서로 독립적인 API 호출들을 동시에 실행 ([(method, data), ...])
+
+        실패한 호출은 예외 객체가 해당 위치에 그대로 담겨 반환됩니다.
+        """
+        if not self.connected:
+            raise SlackNotConnected()
+
+        return await asyncio.gather(
+            *[self._api_call(method, data) for method, data in calls],
+            return_exceptions=True,
+        )
 
     async def get_available_tools(self) -> List[str]:
         """사용 가능한 도구 목록 조회"""
         if not self.connected:
-            raise Exception("연결되지 않음")
+            raise SlackNotConnected()
 
         # 실제 사용 가능한 도구 목록
         tools = [
@@ -117,96 +433,131 @@ class SlackMCP:
 
         return tools
 
-    async def list_channels(self) -> List[Dict[str, Any]]:
-        """채널 목록 조회"""
-        if not self.connected:
-            raise Exception("연결되지 않음")
-
-        try:
-            # 공개 채널 목록 조회
-            response = await self._api_call(
-                "conversations.list",
-                {"types": "public_channel,private_channel", "exclude_archived": True},
-            )
-
-            if not response.get("ok"):
-                raise Exception(
-                    f"채널 목록 조회 실패: {response.get('error', 'Unknown error')}"
-                )
-
-            channels = []
-            for channel in response.get("channels", []):
-                channels.append(
-                    {
-                        "id": channel.get("id"),
-                        "name": channel.get("name"),
-                        "is_private": channel.get("is_private", False),
-                        "members": channel.get("num_members", 0),
-                        "purpose": channel.get("purpose", {}).get("value", ""),
-                        "topic": channel.get("topic", {}).get("value", ""),
-                        "created": channel.get("created", 0),
-                    }
-                )
-
-            return channels
+    async def list_channels(
+        self, fields: Optional[tuple] = None
+    ) -> List[Dict[str, Any]]:
+        """채널 목록 조회
 
-        except Exception as e:
-            raise Exception(f"채널 목록 조회 중 오류: {e}")
+        fields를 지정하면 해당 키만 담은 dict를 만듭니다. (예: ("id", "name"))
+        """
+        if not self.connected:
+            raise SlackNotConnected()
+
+        async def fetch():
+            # 공개/비공개 채널 목록 조회 - cursor pagination 처리
+            # (cursor는 이전 페이지 응답에서만 얻을 수 있어 순차 조회, id 기준 중복 제거)
+            merged: Dict[str, Dict[str, Any]] = {}
+            cursor = None
+            while True:
+                params = {
+                    "types": "public_channel,private_channel",
+                    "exclude_archived": True,
+                    "limit": 1000,
+                }
+                if cursor:
+                    params["cursor"] = cursor
+                response = await self._api_call("conversations.list", params)
+
+                for c in response.get("channels", ()):
+                    merged[c["id"]] = c
+
+                cursor = (response.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    break
+
+            raw = merged.values()
+            if fields is not None:
+                getters = [(f, _CHANNEL_FIELDS[f]) for f in fields]
+                return [{f: get(c) for f, get in getters} for c in raw]
+
+            return [
+                {
+                    "id": c["id"],
+                    "name": c["name"],
+                    "is_private": c.get("is_private", False),
+                    "members": c.get("num_members", 0),
+                    "purpose": (c.get("purpose") or {}).get("value", ""),
+                    "topic": (c.get("topic") or {}).get("value", ""),
+                    "created": c.get("created", 0),
+                }
+                for c in raw
+            ]
+
+        return await self._cached(self._channel_cache, ("channels", fields), fetch)
 
     async def send_message(
         self, channel: str, text: str, blocks: List[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """메시지 전송"""
         if not self.connected:
-            raise Exception("연결되지 않음")
-
-        try:
-            data = {"channel": channel, "text": text}
+            raise SlackNotConnected()
+
+        # blocks 없는 단순 텍스트는 짧은 시간 모아서 한 번에 전송
+        if SLACK_COALESCE_WINDOW > 0 and not blocks:
+            future = asyncio.get_running_loop().create_future()
+            self._pending.setdefault(channel, []).append((text, future))
+            if channel not in self._flush_task:
+                self._flush_task[channel] = asyncio.create_task(
+                    self._flush_messages(channel)
+                )
+            return await future
 
-            if blocks:
-                data["blocks"] = blocks
+        data = {"channel": channel, "text": text}
 
-            response = await self._api_call("chat.postMessage", data)
+        if blocks:
+            data["blocks"] = blocks
 
-            if not response.get("ok"):
-                raise Exception(
-                    f"메시지 전송 실패: {response.get('error', 'Unknown error')}"
-                )
+        return await self._api_call("chat.postMessage", data)
 
-            return response
+    async def _flush_messages(self, channel: str):
+        """대기 중인 메시지를 줄바꿈으로 합쳐 chat.postMessage 한 번으로 전송"""
+        await asyncio.sleep(SLACK_COALESCE_WINDOW)
+        # 전송 중 들어오는 메시지는 새 배치로 모이도록 먼저 비움
+        pending = self._pending.pop(channel, [])
+        self._flush_task.pop(channel, None)
 
+        try:
+            response = await self._api_call(
+                "chat.postMessage",
+                {"channel": channel, "text": "\n".join(t for t, _ in pending)},
+            )
         except Exception as e:
-            raise Exception(f"메시지 전송 중 오류: {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, future in pending:
+            if not future.done():
+                future.set_result(response)
 
     async def get_channel_history(
         self, channel: str, limit: int = 100
     ) -> List[Dict[str, Any]]:
         """채널 히스토리 조회"""
         if not self.connected:
-            raise Exception("연결되지 않음")
+            raise SlackNotConnected()
 
         try:
             response = await self._api_call(
                 "conversations.history", {"channel": channel, "limit": limit}
             )
-
-            if not response.get("ok"):
-                error = response.get("error", "Unknown error")
-                if error == "channel_not_found":
-                    raise Exception(
-                        f"채널 히스토리 조회 실패: 채널을 찾을 수 없거나 Bot이 해당 채널에 접근할 권한이 없습니다. (채널: {channel})"
-                    )
-                elif error == "missing_scope":
-                    raise Exception(
-                        f"채널 히스토리 조회 실패: Bot에 'channels:history' 권한이 필요합니다."
-                    )
-                else:
-                    raise Exception(f"채널 히스토리 조회 실패: {error}")
-
-            return response.get("messages", [])
-
-        except Exception as e:
-            raise Exception(f"채널 히스토리 조회 중 오류: {e}")
+        except SlackAPIError as e:
+            if e.error == "channel_not_found":
+                message = f"채널 히스토리 조회 실패: 채널을 찾을 수 없거나 Bot이 해당 채널에 접근할 권한이 없습니다. (채널: {channel})"
+            elif e.error == "missing_scope":
+                message = "채널 히스토리 조회 실패: Bot에 'channels:history' 권한이 필요합니다."
+            else:
+                raise
+            raise SlackAPIError(
+                e.error,
+                method=e.method,
+                payload=e.payload,
+                response=e.response,
+                message=message,
+            ) from e
+
+        return response.get("messages", [])
 
     def _normalize_channel_name(self, name: str) -> str:
         """채널명을 Slack 규칙에 맞게 정규화"""
@@ -258,85 +609,105 @@ class SlackMCP:
     ) -> Dict[str, Any]:
         """채널 생성"""
         if not self.connected:
-            raise Exception("연결되지 않음")
+            raise SlackNotConnected()
 
-        try:
-            # 채널명 정규화
-            original_name = name
-            normalized_name = self._normalize_channel_name(name)
+        # 채널명 정규화
+        original_name = name
+        normalized_name = self._normalize_channel_name(name)
 
-            print(f"📋 채널명 변환: '{original_name}' → '{normalized_name}'")
+        print(f"📋 채널명 변환: '{original_name}' → '{normalized_name}'")
 
-            method = "conversations.create"
-            data = {"name": normalized_name, "is_private": is_private}
+        method = "conversations.create"
+        data = {"name": normalized_name, "is_private": is_private}
 
+        try:
             response = await self._api_call(method, data)
-
-            if not response.get("ok"):
-                error = response.get("error", "Unknown error")
-                if error == "invalid_name_specials":
-                    raise Exception(
-                        f"채널 생성 실패: 채널명에 허용되지 않는 문자가 포함되어 있습니다. "
-                        f"채널명은 소문자, 숫자, 하이픈(-)만 사용 가능합니다. "
-                        f"시도한 이름: '{name}'"
-                    )
-                elif error == "name_taken":
-                    raise Exception(
-                        f"채널 생성 실패: '{name}' 이름이 이미 사용 중입니다."
-                    )
-                elif error == "invalid_name":
-                    raise Exception(
-                        f"채널 생성 실패: 유효하지 않은 채널명입니다. "
-                        f"채널명은 21자 이하, 소문자로 시작해야 합니다. (시도한 이름: '{name}')"
+        except SlackAPIError as e:
+            if e.error == "invalid_name_specials":
+                message = (
+                    f"채널 생성 실패: 채널명에 허용되지 않는 문자가 포함되어 있습니다. "
+                    f"채널명은 소문자, 숫자, 하이픈(-)만 사용 가능합니다. "
+                    f"시도한 이름: '{name}'"
+                )
+            elif e.error == "name_taken":
+                message = f"채널 생성 실패: '{name}' 이름이 이미 사용 중입니다."
+            elif e.error == "invalid_name":
+                message = (
+                    f"채널 생성 실패: 유효하지 않은 채널명입니다. "
+                    f"채널명은 21자 이하, 소문자로 시작해야 합니다. (시도한 이름: '{name}')"
+                )
+            else:
+                raise
+            raise SlackAPIError(
+                e.error,
+                method=e.method,
+                payload=e.payload,
+                response=e.response,
+                message=message,
+            ) from e
+
+        # 채널 목록이 바뀌었으므로 캐시 무효화
+        self._channel_cache.clear()
+
+        # 성공 응답에 변환 정보 추가
+        response["original_name"] = original_name
+        response["normalized_name"] = normalized_name
+
+        # 한글 이름이 변환된 경우 채널 설명에 원래 이름 추가
+        if original_name != normalized_name:
+            try:
+                channel_id = response.get("channel", {}).get("id")
+                if channel_id:
+                    await self._api_call(
+                        "conversations.setPurpose",
+                        {
+                            "channel": channel_id,
+                            "purpose": f"원래 이름: {original_name}",
+                        },
                     )
-                else:
-                    raise Exception(f"채널 생성 실패: {error}")
-
-            # 성공 응답에 변환 정보 추가
-            response["original_name"] = original_name
-            response["normalized_name"] = normalized_name
-
-            # 한글 이름이 변환된 경우 채널 설명에 원래 이름 추가
-            if original_name != normalized_name:
-                try:
-                    channel_id = response.get("channel", {}).get("id")
-                    if channel_id:
-                        await self._api_call(
-                            "conversations.setPurpose",
-                            {
-                                "channel": channel_id,
-                                "purpose": f"원래 이름: {original_name}",
-                            },
-                        )
-                        print(f"📝 채널 설명에 원래 이름 추가: {original_name}")
-                except Exception as e:
-                    print(f"⚠️ 채널 설명 설정 실패: {e}")
+                    print(f"📝 채널 설명에 원래 이름 추가: {original_name}")
+            except SlackError as e:
+                print(f"⚠️ 채널 설명 설정 실패: {e}")
 
-            return response
-
-        except Exception as e:
-            raise Exception(f"채널 생성 중 오류: {e}")
+        return response
 
     async def invite_to_channel(self, channel: str, users: List[str]) -> bool:
         """채널 초대"""
         if not self.connected:
-            raise Exception("연결되지 않음")
-
-        try:
-            for user in users:
-                response = await self._api_call(
-                    "conversations.invite", {"channel": channel, "users": user}
+            raise SlackNotConnected()
+
+        it = iter(users)
+        failed: List[Dict[str, Any]] = []
+        # conversations.invite는 호출당 최대 1000명까지 허용
+        # force=True라 유효한 사용자는 모두 초대되고, 실패한 사용자만 errors로 돌아옴
+        while batch := list(islice(it, SLACK_INVITE_BATCH_SIZE)):
+            try:
+                await self._api_call(
+                    "conversations.invite",
+                    {"channel": channel, "users": ",".join(batch), "force": True},
+                )
+            except SlackAPIError as e:
+                errors = e.response.get("errors")
+                if not errors:
+                    raise
+                # 이미 참여 중인 사용자는 실패로 보지 않음
+                failed.extend(
+                    err for err in errors if err.get("error") != "already_in_channel"
                 )
 
-                if not response.get("ok"):
-                    raise Exception(
-                        f"사용자 초대 실패: {response.get('error', 'Unknown error')}"
-                    )
-
-            return True
-
-        except Exception as e:
-            raise Exception(f"채널 초대 중 오류: {e}")
+        # 멤버 수가 바뀌었으므로 채널 캐시 무효화 (일부만 성공한 경우 포함)
+        self._channel_cache.clear()
+
+        if failed:
+            summary = ", ".join(f"{err.get('user')}({err.get('error')})" for err in failed)
+            raise SlackAPIError(
+                failed[0].get("error", "invite_failed"),
+                method="conversations.invite",
+                payload={"channel": channel, "users": ",".join(users)},
+                response={"ok": False, "errors": failed},
+                message=f"conversations.invite 일부 사용자 초대 실패: {summary}",
+            )
+        return True
 
     async def upload_file(
         self,
@@ -347,87 +718,127 @@ class SlackMCP:
     ) -> Dict[str, Any]:
         """파일 업로드"""
         if not self.connected:
-            raise Exception("연결되지 않음")
-
-        try:
-            data = {
-                "channels": ",".join(channels),
-                "title": title or os.path.basename(file_path),
-                "initial_comment": comment,
-            }
-
-            # 실제 파일 업로드는 multipart form을 사용해야 하므로 간소화
-            response = await self._api_call("files.upload", data)
-
-            if not response.get("ok"):
-                raise Exception(
-                    f"파일 업로드 실패: {response.get('error', 'Unknown error')}"
-                )
+            raise SlackNotConnected()
+
+        if SLACK_LEGACY_UPLOAD:
+            return await self._legacy_upload(channels, file_path, title, comment)
+
+        filename = os.path.basename(file_path)
+        length = str(os.path.getsize(file_path))
+
+        # 1) 업로드 URL 발급 (form 인자만 허용)
+        ticket = await self._api_call(
+            "files.getUploadURLExternal",
+            {"filename": filename, "length": length},
+            form=True,
+        )
+
+        # 2) 파일 본문을 청크 단위로 스트리밍 전송 (전체를 메모리에 올리지 않음)
+        session = await get_session()
+        async with session.post(
+            ticket["upload_url"],
+            data=_iter_file_chunks(file_path),
+            headers={"Content-Length": length},
+        ) as upload:
+            if upload.status != 200:
+                raise SlackError(f"파일 전송 실패: HTTP {upload.status}")
+
+        # 3) 업로드 완료 및 채널 공유
+        data = {
+            "files": [{"id": ticket["file_id"], "title": title or filename}],
+        }
+        if len(channels) == 1:
+            data["channel_id"] = channels[0]
+        elif channels:
+            data["channels"] = ",".join(channels)
+        if comment:
+            data["initial_comment"] = comment
 
-            return response
+        return await self._api_call("files.completeUploadExternal", data)
 
-        except Exception as e:
-            raise Exception(f"파일 업로드 중 오류: {e}")
+    async def _legacy_upload(
+        self,
+        channels: List[str],
+        file_path: str,
+        title: str = None,
+        comment: str = None,
+    ) -> Dict[str, Any]:
+        """레거시 files.upload로 파일 전송
+
+        multipart 본문의 파일 파트를 청크 단위로 스트리밍하므로
+        파일 크기와 관계없이 메모리 사용량이 일정합니다.
+        """
+        filename = os.path.basename(file_path)
+
+        with aiohttp.MultipartWriter("form-data") as mpwriter:
+            fields = {"title": title or filename, "filename": filename}
+            if channels:
+                fields["channels"] = ",".join(channels)
+            if comment:
+                fields["initial_comment"] = comment
+            for name, value in fields.items():
+                part = mpwriter.append(value)
+                part.set_content_disposition("form-data", name=name)
+
+            part = mpwriter.append(
+                _iter_file_chunks(file_path),
+                {"Content-Type": "application/octet-stream"},
+            )
+            part.set_content_disposition("form-data", name="file", filename=filename)
+
+        session = await get_session()
+        async with self._sem["_default"]:
+            self._last_call = time.monotonic()
+            # Content-Type(boundary 포함)은 aiohttp가 MultipartWriter에서 설정
+            async with session.post(
+                f"{self.base_url}/files.upload",
+                data=mpwriter,
+                headers=self._form_headers,
+            ) as response:
+                response.raise_for_status()
+                result = orjson.loads(await response.read())
+
+        if not result.get("ok"):
+            raise SlackAPIError(
+                result.get("error", "Unknown error"),
+                method="files.upload",
+                payload=fields,
+                response=result,
+            )
+        return result
 
     async def set_status(self, text: str, emoji: str = None) -> bool:
         """상태 설정"""
         if not self.connected:
-            raise Exception("연결되지 않음")
-
-        try:
-            profile = {"status_text": text}
-            if emoji:
-                profile["status_emoji"] = emoji
-
-            response = await self._api_call("users.profile.set", {"profile": profile})
-
-            if not response.get("ok"):
-                raise Exception(
-                    f"상태 설정 실패: {response.get('error', 'Unknown error')}"
-                )
+            raise SlackNotConnected()
 
-            return True
+        profile = {"status_text": text}
+        if emoji:
+            profile["status_emoji"] = emoji
 
-        except Exception as e:
-            raise Exception(f"상태 설정 중 오류: {e}")
+        await self._api_call("users.profile.set", {"profile": profile})
+        return True
 
     async def get_user_info(self, user_id: str) -> Dict[str, Any]:
         """사용자 정보 조회"""
         if not self.connected:
-            raise Exception("연결되지 않음")
+            raise SlackNotConnected()
 
-        try:
-            response = await self._api_call("users.info", {"user": user_id})
+        async def fetch():
+            return await self._api_call("users.info", {"user": user_id})
 
-            if not response.get("ok"):
-                raise Exception(
-                    f"사용자 정보 조회 실패: {response.get('error', 'Unknown error')}"
-                )
-
-            return response
-
-        except Exception as e:
-            raise Exception(f"사용자 정보 조회 중 오류: {e}")
+        return await self._cached(self._user_cache, user_id, fetch)
 
     async def search_messages(
         self, query: str, count: int = 20
     ) -> List[Dict[str, Any]]:
         """메시지 검색"""
         if not self.connected:
-            raise Exception("연결되지 않음")
+            raise SlackNotConnected()
 
-        try:
-            response = await self._api_call(
-                "search.messages", {"query": query, "count": count}
-            )
-
-            if not response.get("ok"):
-                raise Exception(
-                    f"메시지 검색 실패: {response.get('error', 'Unknown error')}"
-                )
+        response = await self._api_call(
+            "search.messages", {"query": query, "count": count}
+        )
 
-            messages = response.get("messages", {})
-            return messages.get("matches", [])
-
-        except Exception as e:
-            raise Exception(f"메시지 검색 중 오류: {e}")
+        messages = response.get("messages", {})
+        return messages.get("matches", [])
@@ -0,0 +1,8 @@
+"""
+Slack MCP 서버 호환 모듈
+기존 SlackServer 임포트 경로를 실제 구현(SlackMCP)으로 연결합니다.
+"""
+
+from .slack_mcp import SlackMCP as SlackServer
+
+__all__ = ["SlackServer"]
@@ -4,20 +4,35 @@
 
 import os
 import sys
+import atexit
+import asyncio
+import logging
 import time
+import queue
+import sqlite3
+import struct
 import zipfile
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 
+import numpy as np
 import pdfplumber
 import docx
 import openpyxl
+from cachetools import LRUCache
 from dotenv import load_dotenv
 
 import chromadb
 from chromadb.config import Settings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 # ─────────────────────────────────────────────────────────
 # 환경 변수 로드
@@ -27,29 +42,96 @@ load_dotenv()
 # Chroma/Collection
 CHROMA_PATH = os.getenv("CHROMA_PATH", "./chroma_data")
 COLLECTION_NAME = os.getenv("COLLECTION_NAME", "inside_data")
+# HNSW 인덱스 파라미터 (컬렉션 최초 생성 시에만 적용, internal_retrieve도 이 값을 사용)
+# - M / construction_ef: 그래프 밀도와 구축 품질 (클수록 recall↑, 메모리·구축 시간↑)
+# - search_ef: 질의 시 탐색 폭. 올리면 recall↑ 대신 지연↑ (internal_retrieve.set_ef_search로 런타임 조정)
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": int(os.getenv("HNSW_M", "32")),
+    "hnsw:construction_ef": int(os.getenv("HNSW_EFC", "200")),
+    "hnsw:search_ef": int(os.getenv("HNSW_EFS", "100")),
+}
+
+# 청크별 상세 로그는 INGEST_LOG_LEVEL=debug 일 때만 출력
+logger = logging.getLogger(__name__)
+if os.getenv("INGEST_LOG_LEVEL", "").lower() == "debug":
+    logger.setLevel(logging.DEBUG)
 
 # 청킹 파라미터 (필요시 .env로 조절)
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))       # 청크 크기
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "150"))  # 오버랩
+# true면 CHUNK_SIZE/CHUNK_OVERLAP을 문자 수가 아닌 cl100k_base 토큰 수로 해석
+CHUNK_BY_TOKENS = os.getenv("CHUNK_BY_TOKENS", "false").lower() == "true"
 
 # 엑셀 폭발 방지 옵션
 XLSX_MAX_ROWS_PER_SHEET = int(os.getenv("XLSX_MAX_ROWS_PER_SHEET", "10000"))
 XLSX_MAX_COLS_PER_SHEET = int(os.getenv("XLSX_MAX_COLS_PER_SHEET", "512"))     # 🔹 추가: 열 상한 캡
 XLSX_SKIP_HIDDEN_SHEETS = os.getenv("XLSX_SKIP_HIDDEN_SHEETS", "true").lower() == "true"
 
-# 임베딩 요청 배치 한도 (요청당 토큰 상한 300k 대비 여유)
-EMBED_MAX_TOKENS_PER_REQUEST = int(os.getenv("EMBED_MAX_TOKENS_PER_REQUEST", "280000"))
-EMBED_MAX_ITEMS_PER_REQUEST = int(os.getenv("EMBED_MAX_ITEMS_PER_REQUEST", "256"))
+# 임베딩 모델과 모델별 API 한도: (입력 하나당 최대 토큰, 요청당 최대 토큰)
+EMBED_MODEL = "text-embedding-3-small"
+_EMBED_MODEL_LIMITS = {
+    "text-embedding-3-small": (8192, 300_000),
+    "text-embedding-3-large": (8192, 300_000),
+    "text-embedding-ada-002": (8191, 300_000),
+}
+EMBED_MAX_INPUT_TOKENS, _EMBED_MODEL_REQUEST_TOKENS = _EMBED_MODEL_LIMITS.get(EMBED_MODEL, (8192, 300_000))
+
+# 임베딩 요청 배치 한도 (요청당 토큰 상한 대비 여유, 입력 개수는 API 상한 2048)
+EMBED_MAX_TOKENS_PER_REQUEST = min(
+    int(os.getenv("EMBED_MAX_TOKENS_PER_REQUEST", "280000")), _EMBED_MODEL_REQUEST_TOKENS
+)
+EMBED_MAX_ITEMS_PER_REQUEST = min(int(os.getenv("EMBED_MAX_ITEMS_PER_REQUEST", "256")), 2048)
+
+# 입력 하나가 EMBED_MAX_INPUT_TOKENS를 넘으면 이 크기(토큰, 오버랩 포함) 조각으로 나눠 임베딩 후 평균
+_LONG_PIECE_TOKENS = 6000
+_LONG_PIECE_OVERLAP = 200
+
+# 청킹-임베딩 파이프라인에서 한 번에 청킹하는 원문 블록 크기(문자)
+# 이보다 짧은 문서는 한 번에 청킹되어 기존과 동일한 청크가 나옴
+STREAM_BLOCK_CHARS = int(os.getenv("STREAM_BLOCK_CHARS", "200000"))
+
+# 이 길이(문자) 이상인 문서는 블록별 청킹을 프로세스 풀에서 병렬 실행 (SPLIT_WORKERS=1이면 비활성)
+SPLIT_PARALLEL_MIN_CHARS = int(os.getenv("SPLIT_PARALLEL_MIN_CHARS", "200000"))
+SPLIT_WORKERS = int(os.getenv("SPLIT_WORKERS", str(os.cpu_count() or 1)))
+
+# 청크 임베딩 영구 캐시 경로 (빈 값이면 캐시 비활성, Chroma 저장 디렉토리와 분리)
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "./.embed_cache/ingest.sqlite3")
+# 캐시 저장 형식: fp16(기본, 2B/차원) | int8(벡터별 스케일 + 1B/차원) | none(float32)
+EMBED_QUANT = os.getenv("EMBED_QUANT", "fp16").lower()
+if EMBED_QUANT not in ("fp16", "int8", "none"):
+    EMBED_QUANT = "fp16"
+
+# 임베딩 배치를 동시에 요청하는 최대 개수 (프로세스 전체 공유)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
+
+# 다중 파일 병렬 처리 스레드 수 / OpenAI 분당 요청 상한 (0이면 제한 없음)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "8"))
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "3000"))
+
+# PDF 페이지 텍스트 추출 스레드 수 (1이면 순차 처리)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+
+# tiktoken BPE 사전 캐시 위치를 고정 (기본값인 임시 디렉터리는 재시작/컨테이너마다 비워져 매번 다시 내려받음)
+# 컨테이너 이미지에서는 빌드 시 이 경로로 미리 받아두면 콜드 스타트가 빨라짐:
+#   python -c "import tiktoken; tiktoken.get_encoding('cl100k_base')"
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", str(Path.home() / ".cache" / "tiktoken"))
+
+# tiktoken은 선택적 (인코더는 프로세스당 한 번만 로드)
+@lru_cache(maxsize=1)
+def _get_encoder():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
 
-# tiktoken은 선택적
-try:
-    import tiktoken
-    _TIKTOKEN_ENC = tiktoken.get_encoding("cl100k_base")
-except Exception:
-    _TIKTOKEN_ENC = None
 
-# OpenAI
-client = OpenAI()
+_TIKTOKEN_ENC = _get_encoder()
+
+# 청크 내용 해시 → 토큰 수 (반복되는 머리글/표 행 등의 재계산 방지)
+_TOKEN_COUNT_CACHE: LRUCache = LRUCache(maxsize=100_000)
+_TOKEN_COUNT_LOCK = threading.Lock()
 
 
 # ─────────────────────────────────────────────────────────
@@ -76,62 +158,561 @@ def _detect_office_kind(path: Path) -> Optional[str]:
         return None
 
 
+# ─────────────────────────────────────────────────────────
+# 유틸: 스레드 간 공유하는 요청 속도 제한
+# ─────────────────────────────────────────────────────────
+class _RateLimiter:
+    """분당 rpm회를 넘지 않도록 호출 간 최소 간격을 보장 (스레드 안전)"""
+
+    def __init__(self, rpm: int):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def reserve(self) -> float:
+        """다음 호출 슬롯을 예약하고 그때까지 기다려야 할 시간(초)을 반환"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        return max(0.0, delay)
+
+
+_embed_limiter = _RateLimiter(OPENAI_RPM)
+
+
 # ─────────────────────────────────────────────────────────
 # 임베딩 배치 유틸
 # ─────────────────────────────────────────────────────────
 def _estimate_tokens(text: str) -> int:
     """임베딩 토큰 대략치. tiktoken 있으면 정확, 없으면 문자수/4 근사."""
-    if _TIKTOKEN_ENC is not None:
-        try:
-            return len(_TIKTOKEN_ENC.encode(text))
-        except Exception:
-            pass
-    return max(1, len(text) // 4)
+    if _TIKTOKEN_ENC is None:
+        return max(1, len(text) // 4)
 
+    # 긴 문자열을 그대로 키로 두지 않도록 16바이트 해시로 캐시
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _TOKEN_COUNT_LOCK:
+        cached = _TOKEN_COUNT_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-def embed_texts_batched(texts: List[str]) -> List[List[float]]:
-    """토큰/아이템 예산을 지켜가며 여러 번으로 나눠 임베딩."""
-    if not texts:
-        return []
+    try:
+        count = len(_TIKTOKEN_ENC.encode(text))
+    except Exception:
+        return max(1, len(text) // 4)
+    with _TOKEN_COUNT_LOCK:
+        _TOKEN_COUNT_CACHE[key] = count
+    return count
 
-    batches: List[List[str]] = []
+
+def _estimate_tokens_batch(texts: List[str]) -> List[int]:
+    """여러 청크의 토큰 수를 한 번에 계산 (캐시 미스만 encode_ordinary_batch로 일괄 인코딩)"""
+    if _TIKTOKEN_ENC is None:
+        return [max(1, len(t) // 4) for t in texts]
+
+    keys = [hashlib.blake2b(t.encode("utf-8"), digest_size=16).digest() for t in texts]
+    with _TOKEN_COUNT_LOCK:
+        counts = [_TOKEN_COUNT_CACHE.get(k) for k in keys]
+
+    missing = [i for i, c in enumerate(counts) if c is None]
+    if missing:
+        encoded = _TIKTOKEN_ENC.encode_ordinary_batch(
+            [texts[i] for i in missing], num_threads=os.cpu_count() or 1
+        )
+        with _TOKEN_COUNT_LOCK:
+            for i, tokens in zip(missing, encoded):
+                counts[i] = len(tokens)
+                _TOKEN_COUNT_CACHE[keys[i]] = counts[i]
+    return counts
+
+
+@retry(
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+    wait=wait_random_exponential(min=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+async def _request_embeddings_async(aclient: AsyncOpenAI, batch: List[str]) -> List[List[float]]:
+    """embeddings API 요청 1회 (rate limit/일시 오류는 지수 백오프로 재시도, OPENAI_RPM 속도 제한)"""
+    delay = _embed_limiter.reserve()
+    if delay > 0:
+        await asyncio.sleep(delay)
+    resp = await aclient.embeddings.create(
+        model=EMBED_MODEL,
+        input=batch
+    )
+    return [d.embedding for d in resp.data]
+
+
+def _split_long_input(text: str) -> List[Tuple[str, int]]:
+    """입력 토큰 상한을 넘는 텍스트를 오버랩 있는 조각으로 분할 → [(조각, 토큰 수)]"""
+    step = _LONG_PIECE_TOKENS - _LONG_PIECE_OVERLAP
+    if _TIKTOKEN_ENC is None:
+        # tiktoken이 없으면 문자수/4 근사와 같은 비율로 문자 단위 분할
+        size, step = _LONG_PIECE_TOKENS * 4, step * 4
+        return [
+            (text[i:i + size], max(1, len(text[i:i + size]) // 4))
+            for i in range(0, max(1, len(text) - _LONG_PIECE_OVERLAP * 4), step)
+        ]
+    tokens = _TIKTOKEN_ENC.encode_ordinary(text)
+    pieces = []
+    for i in range(0, max(1, len(tokens) - _LONG_PIECE_OVERLAP), step):
+        window = tokens[i:i + _LONG_PIECE_TOKENS]
+        pieces.append((_TIKTOKEN_ENC.decode(window), len(window)))
+    return pieces
+
+
+def _merge_piece_embeddings(embs: List[List[float]], weights: List[int]) -> List[float]:
+    """조각 임베딩들을 토큰 수 가중 평균 후 L2 정규화해 하나의 벡터로 합침"""
+    avg = np.average(np.asarray(embs, dtype=np.float32), axis=0, weights=weights)
+    norm = float(np.linalg.norm(avg))
+    return (avg / norm if norm else avg).tolist()
+
+
+def _long_piece_groups(pieces: List[Tuple[str, int]]):
+    """긴 입력의 조각들을 요청당 토큰 예산에 맞게 나눠 yield"""
+    per_request = max(1, EMBED_MAX_TOKENS_PER_REQUEST // _LONG_PIECE_TOKENS)
+    for i in range(0, len(pieces), per_request):
+        yield [p for p, _ in pieces[i:i + per_request]]
+
+
+async def _embed_batch_async(aclient: AsyncOpenAI, batch: List[str]) -> List[List[float]]:
+    """배치 하나를 임베딩 (입력 토큰 상한 초과 텍스트는 조각 임베딩의 평균으로 대체)"""
+    if len(batch) == 1 and _estimate_tokens(batch[0]) > EMBED_MAX_INPUT_TOKENS:
+        pieces = _split_long_input(batch[0])
+        embs = []
+        for group in _long_piece_groups(pieces):
+            embs.extend(await _request_embeddings_async(aclient, group))
+        return [_merge_piece_embeddings(embs, [n for _, n in pieces])]
+    return await _request_embeddings_async(aclient, batch)
+
+
+def _pack_batches(items):
+    """(텍스트, 토큰 수) 스트림을 토큰/아이템 예산에 맞는 배치로 묶어 순서대로 yield"""
     current: List[str] = []
     current_tokens = 0
 
-    for t in texts:
-        tk = _estimate_tokens(t)
-
-        # 단일 청크가 예산을 넘더라도(거의 없지만) 단독 배치로 보냄
-        if tk > EMBED_MAX_TOKENS_PER_REQUEST:
+    for t, tk in items:
+        # 입력 토큰 상한을 넘는 청크는 단독 배치로 보내 조각 분할 후 평균 임베딩
+        if tk > EMBED_MAX_INPUT_TOKENS:
             if current:
-                batches.append(current)
+                yield current
                 current, current_tokens = [], 0
-            batches.append([t])
+            yield [t]
             continue
 
         if current and (
             current_tokens + tk > EMBED_MAX_TOKENS_PER_REQUEST
             or len(current) >= EMBED_MAX_ITEMS_PER_REQUEST
         ):
-            batches.append(current)
+            yield current
             current, current_tokens = [], 0
 
         current.append(t)
         current_tokens += tk
 
     if current:
-        batches.append(current)
-
-    all_embeddings: List[List[float]] = []
-    for i, batch in enumerate(batches, 1):
-        print(f"  🔎 임베딩 배치 {i}/{len(batches)} (items={len(batch)}) 요청 중...")
-        resp = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=batch
+        yield current
+
+
+async def embed_texts_batched_async(
+    texts: List[str], aclient: Optional[AsyncOpenAI] = None
+) -> List[List[float]]:
+    """토큰/아이템 예산에 맞춘 배치들을 하나의 이벤트 루프에서 동시에 임베딩.
+
+    aclient를 넘기지 않으면 호출 동안만 쓰는 AsyncOpenAI 클라이언트를 만들고 닫습니다.
+    (httpx 커넥션 풀이 이벤트 루프에 묶여 있어 asyncio.run 사이에 공유하지 않음)
+    """
+    if not texts:
+        return []
+
+    batches = list(_pack_batches(zip(texts, _estimate_tokens_batch(texts))))
+    print(f"  🔎 임베딩 배치 {len(batches)}개 요청 중... (items={len(texts)}, 동시 {EMBED_CONCURRENCY})")
+
+    sem = asyncio.Semaphore(max(1, EMBED_CONCURRENCY))
+
+    async def bounded(ac: AsyncOpenAI, batch: List[str]):
+        async with sem:
+            return await _embed_batch_async(ac, batch)
+
+    if aclient is None:
+        async with AsyncOpenAI() as ac:
+            results = await asyncio.gather(*(bounded(ac, b) for b in batches))
+    else:
+        results = await asyncio.gather(*(bounded(aclient, b) for b in batches))
+
+    # gather는 입력 순서대로 결과를 돌려주므로 그대로 펼치면 순서 유지
+    return [emb for batch_embs in results for emb in batch_embs]
+
+
+# 임베딩 요청 전용 이벤트 루프 스레드 (프로세스 전체가 AsyncOpenAI 클라이언트 하나와 동시 요청 상한을 공유)
+# 동기 코드(파일 처리 스레드)는 submit_embed_batch로 코루틴을 넘기고 concurrent Future로 결과를 받음
+_embed_loop: Optional[asyncio.AbstractEventLoop] = None
+_embed_loop_lock = threading.Lock()
+_embed_aclient: Optional[AsyncOpenAI] = None
+_embed_sem: Optional[asyncio.Semaphore] = None
+
+
+def _get_embed_loop() -> asyncio.AbstractEventLoop:
+    global _embed_loop
+    with _embed_loop_lock:
+        if _embed_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="embed-loop", daemon=True).start()
+
+            async def setup():
+                global _embed_aclient, _embed_sem
+                # 클라이언트(httpx 풀)와 세마포어는 이 루프 안에서 만들어야 함
+                _embed_aclient = AsyncOpenAI()
+                _embed_sem = asyncio.Semaphore(max(1, EMBED_CONCURRENCY))
+
+            asyncio.run_coroutine_threadsafe(setup(), loop).result()
+            _embed_loop = loop
+        return _embed_loop
+
+
+async def _embed_batch_shared(batch: List[str]) -> List[List[float]]:
+    async with _embed_sem:
+        return await _embed_batch_async(_embed_aclient, batch)
+
+
+def submit_embed_batch(batch: List[str]) -> Future:
+    """배치 하나의 임베딩을 공유 이벤트 루프에 제출 (호출 스레드는 블로킹하지 않음)"""
+    return asyncio.run_coroutine_threadsafe(_embed_batch_shared(batch), _get_embed_loop())
+
+
+def _close_embed_loop() -> None:
+    """프로세스 종료 시 공유 클라이언트를 닫고 루프를 멈춤"""
+    loop = _embed_loop
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_embed_aclient.close(), loop).result(timeout=5)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
+
+
+atexit.register(_close_embed_loop)
+
+
+def embed_texts_batched(texts: List[str]) -> List[List[float]]:
+    """토큰/아이템 예산을 지켜가며 여러 번으로 나눠 임베딩 (동기 호출용, 공유 이벤트 루프 사용)"""
+    if not texts:
+        return []
+
+    batches = list(_pack_batches(zip(texts, _estimate_tokens_batch(texts))))
+    futures = [submit_embed_batch(b) for b in batches]
+    return [emb for fut in futures for emb in fut.result()]
+
+
+class _EmbeddingCache:
+    """blake2b(모델+청크) → 양자화된 임베딩 바이트를 저장하는 sqlite 캐시 (스레드 안전)
+
+    같은 파일을 다시 적재할 때 이미 임베딩한 청크는 API를 호출하지 않습니다.
+    저장 형식(EMBED_QUANT)마다 테이블을 분리하므로 형식을 바꿔도 기존 캐시와 섞이지 않습니다.
+    """
+
+    _TABLES = {"fp16": "embeddings", "int8": "embeddings_int8", "none": "embeddings_f32"}
+
+    def __init__(self, path: str, quant: str = "fp16"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.quant = quant
+        self._table = self._TABLES[quant]
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} (key BLOB PRIMARY KEY, vec BLOB NOT NULL)"
         )
-        all_embeddings.extend([d.embedding for d in resp.data])
+        self._conn.commit()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(f"{EMBED_MODEL}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+    def _encode(self, v: List[float]) -> bytes:
+        if self.quant == "int8":
+            arr = np.asarray(v, dtype=np.float32)
+            # 벡터별 스케일: 최대 절댓값을 127에 맞춤 (앞 4바이트에 float32로 저장)
+            scale = float(np.abs(arr).max()) / 127.0 or 1.0
+            q = np.clip(np.round(arr / scale), -127, 127).astype(np.int8)
+            return struct.pack("<f", scale) + q.tobytes()
+        dtype = "<f2" if self.quant == "fp16" else "<f4"
+        return np.asarray(v, dtype=dtype).tobytes()
+
+    def _decode(self, blob: bytes) -> List[float]:
+        if self.quant == "int8":
+            (scale,) = struct.unpack_from("<f", blob)
+            return (np.frombuffer(blob, dtype=np.int8, offset=4).astype(np.float32) * scale).tolist()
+        dtype = "<f2" if self.quant == "fp16" else "<f4"
+        return np.frombuffer(blob, dtype=dtype).astype(np.float32).tolist()
+
+    def get_many(self, keys: List[bytes]) -> dict:
+        found = {}
+        with self._lock:
+            # sqlite 변수 개수 제한을 피하도록 나눠서 조회
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM {self._table} WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+                for k, vec in rows:
+                    found[k] = self._decode(vec)
+        return found
+
+    def put_many(self, items: List[Tuple[bytes, List[float]]]) -> None:
+        rows = [(k, self._encode(v)) for k, v in items]
+        with self._lock:
+            self._conn.executemany(f"INSERT OR REPLACE INTO {self._table} VALUES (?, ?)", rows)
+            self._conn.commit()
+
+
+_embed_cache: Optional[_EmbeddingCache] = None
+_embed_cache_lock = threading.Lock()
+
+
+def _get_embed_cache() -> Optional[_EmbeddingCache]:
+    """영구 임베딩 캐시를 지연 생성 (EMBED_CACHE_PATH가 비어 있거나 열 수 없으면 None)"""
+    global _embed_cache
+    if not EMBED_CACHE_PATH:
+        return None
+    with _embed_cache_lock:
+        if _embed_cache is None:
+            try:
+                _embed_cache = _EmbeddingCache(EMBED_CACHE_PATH, EMBED_QUANT)
+            except Exception as e:
+                print(f"⚠️ 임베딩 캐시 사용 불가: {e}")
+                return None
+        return _embed_cache
+
+
+def _chunks_by_tokens() -> bool:
+    """토큰 기준 청킹 사용 여부 (tiktoken이 없으면 문자 기준으로 동작)"""
+    return CHUNK_BY_TOKENS and _TIKTOKEN_ENC is not None
 
-    return all_embeddings
+
+@lru_cache(maxsize=4)
+def _make_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    if _chunks_by_tokens():
+        # 임베딩 토크나이저와 같은 기준으로 청크 길이를 맞춤
+        return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+            encoding_name="cl100k_base",
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=["\n\n", "\n", " ", ""]
+        )
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+def _split_block(block: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """프로세스 풀 작업 단위: 원문 블록 하나를 청킹 (워커별 splitter 재사용)"""
+    return _make_splitter(chunk_size, chunk_overlap).split_text(block)
+
+
+_split_pool: Optional[ProcessPoolExecutor] = None
+_split_pool_lock = threading.Lock()
+
+
+def _get_split_pool() -> ProcessPoolExecutor:
+    """청킹용 프로세스 풀을 지연 생성 (여러 적재 스레드가 공유)
+
+    이미 writer/임베딩 스레드가 도는 프로세스를 fork하지 않도록 spawn으로 워커를 띄움
+    """
+    global _split_pool
+    with _split_pool_lock:
+        if _split_pool is None:
+            _split_pool = ProcessPoolExecutor(
+                max_workers=SPLIT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(_split_pool.shutdown, cancel_futures=True)
+        return _split_pool
+
+
+def _log_chunks(chunks: List[str], indent: str = "") -> None:
+    """청크 길이 요약(min/avg/max)을 출력하고, 청크별 길이는 debug 로그로만 남김"""
+    if chunks:
+        lens = [len(c) for c in chunks]
+        print(
+            f"{indent}🪓 청킹 완료 → 총 {len(chunks)} chunks, "
+            f"min/avg/max = {min(lens):,}/{sum(lens) / len(lens):,.0f}/{max(lens):,} chars"
+        )
+    else:
+        print(f"{indent}🪓 청킹 완료 → 총 0 chunks")
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, c in enumerate(chunks):
+            logger.debug("[Chunk %d] %s chars", i, f"{len(c):,}")
+
+
+def _iter_text_blocks(raw_text: str):
+    """긴 원문을 STREAM_BLOCK_CHARS 내외의 블록으로 나눠 yield (가능하면 문단 경계에서 자름)"""
+    start = 0
+    while start < len(raw_text):
+        end = start + STREAM_BLOCK_CHARS
+        if end < len(raw_text):
+            cut = raw_text.rfind("\n\n", start, end)
+            if cut > start:
+                end = cut
+        yield raw_text[start:end]
+        start = end
+
+
+# ─────────────────────────────────────────────────────────
+# DOCX: python-docx 객체 생성 없이 document.xml을 직접 파싱
+# ─────────────────────────────────────────────────────────
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_TEXT_TAGS = (f"{_W_NS}t", f"{_W_NS}tab", f"{_W_NS}br", f"{_W_NS}cr")
+
+
+def _docx_paragraph_text(p) -> str:
+    """<w:p> 하나의 텍스트 (python-docx Paragraph.text와 같은 규칙: tab은 탭, br/cr은 줄바꿈)"""
+    parts = []
+    for el in p.iter(*_W_TEXT_TAGS):
+        if el.tag == _W_TEXT_TAGS[0]:
+            parts.append(el.text or "")
+        elif el.tag == _W_TEXT_TAGS[1]:
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _read_docx_xml(path: Path) -> str:
+    """본문 문단 → 최상위 표 순서로 추출 (python-docx 경로와 같은 출력 형식)"""
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        root = etree.parse(f).getroot()
+    body = root.find(f"{_W_NS}body")
+    if body is None:
+        raise ValueError("word/document.xml에 본문이 없습니다.")
+
+    acc: List[str] = []
+    for p in body.iterchildren(f"{_W_NS}p"):
+        text = _docx_paragraph_text(p)
+        if text.strip():
+            acc.append(text)
+    # 테이블 추출(간단)
+    for tbl in body.iterchildren(f"{_W_NS}tbl"):
+        for tr in tbl.iterchildren(f"{_W_NS}tr"):
+            cells = [
+                "\n".join(_docx_paragraph_text(p) for p in tc.iterchildren(f"{_W_NS}p")).strip()
+                for tc in tr.iterchildren(f"{_W_NS}tc")
+            ]
+            if any(cells):
+                acc.append(" | ".join(cells))
+    return "\n".join(acc)
+
+
+# ─────────────────────────────────────────────────────────
+# 적재 완료 알림 (같은 프로세스의 검색 캐시 무효화용)
+# ─────────────────────────────────────────────────────────
+_write_listeners: List[Callable[[], None]] = []
+
+
+def add_write_listener(listener: Callable[[], None]) -> None:
+    """컬렉션 내용이 바뀐 뒤(추가/삭제 성공 시) 호출할 함수 등록"""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def _notify_written() -> None:
+    for listener in _write_listeners:
+        try:
+            listener()
+        except Exception as e:
+            print(f"⚠️ 적재 알림 처리 오류: {e}")
+
+
+# ─────────────────────────────────────────────────────────
+# Chroma 클라이언트/컬렉션 캐시 (SQLite 초기화는 경로당 한 번만)
+# ─────────────────────────────────────────────────────────
+_chroma_lock = threading.Lock()
+
+
+def get_or_create_hnsw_collection(client, name: str):
+    """컬렉션을 열고, 없을 때만 HNSW_METADATA로 생성
+
+    기존 컬렉션에 hnsw:space를 넘기면 Chroma 버전에 따라 오류가 나거나 인덱스와 맞지 않는
+    메타데이터로 덮어쓰므로, 이미 있는 컬렉션의 메타데이터는 건드리지 않습니다.
+    """
+    try:
+        collection = client.get_collection(name=name)
+    except Exception:  # 없는 컬렉션: 버전에 따라 ValueError / NotFoundError
+        return client.create_collection(name=name, metadata=HNSW_METADATA)
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    if space != HNSW_METADATA["hnsw:space"]:
+        print(
+            f"⚠️ 컬렉션 '{name}'의 거리 함수가 {space}입니다 "
+            f"({HNSW_METADATA['hnsw:space']}를 쓰려면 --clear가 아닌 컬렉션 재생성이 필요)"
+        )
+    return collection
+
+
+@lru_cache(maxsize=4)
+def _open_chroma_collection(path: str, name: str):
+    try:
+        # ChromaDB 디렉토리 확인 및 생성
+        Path(path).mkdir(parents=True, exist_ok=True)
+        chroma = chromadb.PersistentClient(
+            path=path,
+            settings=Settings(
+                anonymized_telemetry=False,
+                is_persistent=True,
+            ),
+        )
+        return get_or_create_hnsw_collection(chroma, name)
+    except Exception as e:
+        print(f"ChromaDB 초기화 오류: {str(e)}")
+        print("새로운 ChromaDB 인스턴스로 재시도 중...")
+        chroma = chromadb.Client()
+        return get_or_create_hnsw_collection(chroma, name)
+
+
+# ─────────────────────────────────────────────────────────
+# 백그라운드 Chroma writer
+# ─────────────────────────────────────────────────────────
+class _ChromaWriter:
+    """컬렉션 쓰기를 전담하는 단일 스레드 (파일 처리 스레드는 저장을 기다리지 않음)"""
+
+    def __init__(self, service: "IngestService", collection):
+        self._service = service
+        self._collection = collection
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(2, INGEST_WORKERS * 2))
+        self.written = 0
+        self.failed: dict = {}  # 파일명 → (청크 수, 예외)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, file_name, existing_ids, ids, metadatas, embeddings, chunks) -> None:
+        self._queue.put((file_name, existing_ids, ids, metadatas, embeddings, chunks))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            file_name, existing_ids, ids, metadatas, embeddings, chunks = item
+            try:
+                self._service._write_chunks(
+                    self._collection, file_name, existing_ids, ids, metadatas, embeddings, chunks
+                )
+                self.written += len(ids)
+            except Exception as e:
+                self.failed[file_name] = (len(ids), e)
+
+    def close(self) -> None:
+        """대기 중인 쓰기를 모두 처리한 뒤 스레드 종료"""
+        self._queue.put(None)
+        self._thread.join()
 
 
 # ─────────────────────────────────────────────────────────
@@ -140,28 +721,101 @@ def embed_texts_batched(texts: List[str]) -> List[List[float]]:
 class IngestService:
     """문서 임베딩 및 ChromaDB 저장을 담당하는 서비스 클래스"""
 
+    # splitter는 상태가 없으므로 모든 인스턴스가 공유
+    text_splitter = _make_splitter(CHUNK_SIZE, CHUNK_OVERLAP)
+
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=CHUNK_SIZE,
-            chunk_overlap=CHUNK_OVERLAP,
-            separators=["\n\n", "\n", " ", ""]
-        )
         self.supported_extensions = {".pdf", ".docx", ".xlsx"}
+        # 병렬 처리 시 컬렉션 변경(get/delete/add)은 한 번에 하나씩
+        self._collection_lock = threading.Lock()
+
+    # ========================= 청킹 + 임베딩 =========================
+    def split_and_embed(self, raw_text: str) -> Tuple[List[str], List[List[float]]]:
+        """청킹과 임베딩을 겹쳐 실행
+
+        원문 블록을 청킹하는 제너레이터가 청크를 내는 대로 토큰 예산 배치로 묶어 즉시
+        임베딩 요청을 보냅니다 (요청은 스레드 풀에서 진행되는 동안 다음 블록을 청킹).
+        (청크, 임베딩)을 순서대로 반환. 동일한 청크와 영구 캐시에 이미 있는 청크는
+        API로 보내지 않습니다.
+        """
+        if SPLIT_WORKERS > 1 and len(raw_text) >= SPLIT_PARALLEL_MIN_CHARS:
+            # 큰 문서: 블록들을 여러 프로세스에서 동시에 청킹 (map은 블록 순서 유지)
+            parts = _get_split_pool().map(
+                _split_block,
+                _iter_text_blocks(raw_text),
+                repeat(CHUNK_SIZE),
+                repeat(CHUNK_OVERLAP),
+            )
+        else:
+            parts = (self.text_splitter.split_text(b) for b in _iter_text_blocks(raw_text))
+
+        chunks: List[str] = []
+        by_text: dict = {}  # 고유 청크 → 임베딩 (캐시 적중분은 미리 채움)
+        cache = _get_embed_cache()
+
+        def stream():
+            for item in parts:
+                chunks.extend(item)
+
+                # 블록 내/이전 블록과 중복된 청크 제외
+                fresh = list(dict.fromkeys(c for c in item if c not in by_text))
+                for c in fresh:
+                    by_text[c] = None
+                if cache is not None and fresh:
+                    hits = cache.get_many([cache.key(c) for c in fresh])
+                    if hits:
+                        for c in fresh:
+                            emb = hits.get(cache.key(c))
+                            if emb is not None:
+                                by_text[c] = emb
+                        fresh = [c for c in fresh if by_text[c] is None]
+                if _chunks_by_tokens():
+                    # 토큰 기준 청크는 CHUNK_SIZE 토큰 이하가 보장되므로 상한값으로 예산 계산
+                    yield from zip(fresh, repeat(CHUNK_SIZE))
+                else:
+                    yield from zip(fresh, _estimate_tokens_batch(fresh))
+
+        # 배치가 만들어지는 대로 공유 이벤트 루프에 제출하고, 완료 후 고유 청크별 임베딩을 채움
+        futures = [(batch, submit_embed_batch(batch)) for batch in _pack_batches(stream())]
+        new_items = []
+        for batch, future in futures:
+            for c, emb in zip(batch, future.result()):
+                by_text[c] = emb
+                new_items.append((c, emb))
+
+        if cache is not None and new_items:
+            cache.put_many([(cache.key(c), emb) for c, emb in new_items])
+
+        embeddings = [by_text[c] for c in chunks]
+        return chunks, embeddings
 
     # ========================= 파일 파싱 =========================
     def read_pdf(self, path: Path) -> str:  # PDF 파일 파싱
         texts = []
         try:
             with pdfplumber.open(str(path)) as pdf:
-                for page in pdf.pages:
-                    t = page.extract_text() or ""
-                    if t.strip():
-                        texts.append(t)
+                pages = list(pdf.pages)
+                # 페이지별 추출을 병렬 실행 (map은 페이지 순서 유지)
+                if PDF_WORKERS > 1 and len(pages) > 1:
+                    with ThreadPoolExecutor(max_workers=min(PDF_WORKERS, len(pages))) as executor:
+                        page_texts = list(executor.map(lambda pg: pg.extract_text() or "", pages))
+                else:
+                    page_texts = [pg.extract_text() or "" for pg in pages]
+                texts = [t for t in page_texts if t.strip()]
         except Exception as e:
             raise ValueError(f"PDF 로드 실패: {type(e).__name__}: {e}")
         return "\n\n".join(texts)
 
     def read_docx(self, path: Path) -> str:  # DOCX 파일 파싱
+        # document.xml을 lxml로 직접 읽는 빠른 경로, 실패 시 python-docx로 대체
+        # (lxml 미설치, document.xml 없음/본문 없음, 손상된 zip, XML 파싱 오류 - XMLSyntaxError는 SyntaxError 하위)
+        try:
+            return _read_docx_xml(path)
+        except (ImportError, KeyError, ValueError, zipfile.BadZipFile, SyntaxError) as e:
+            logger.debug("lxml DOCX 경로 실패, python-docx로 대체 (%s): %s: %s", path.name, type(e).__name__, e)
+        return self._read_docx_python_docx(path)
+
+    def _read_docx_python_docx(self, path: Path) -> str:  # 비정상 구조 문서용 대체 경로
         try:
             d = docx.Document(str(path))
         except Exception as e:
@@ -177,6 +831,45 @@ class IngestService:
         return "\n".join(acc)
 
     def read_xlsx(self, path: Path) -> str:  # XLSX 파일 파싱 (폭주 방지 트리밍/캡 적용)
+        # Rust 기반 calamine이 있으면 우선 사용, 없으면 openpyxl
+        try:
+            from python_calamine import CalamineWorkbook
+        except ImportError:
+            return self._read_xlsx_openpyxl(path)
+
+        try:
+            wb = CalamineWorkbook.from_path(str(path))
+        except Exception as e:
+            # 암호화/손상/비정상 구조 등 명확한 메시지 전달
+            raise ValueError(f"엑셀 로드 실패: {type(e).__name__}: {e}")
+
+        if not wb.sheet_names:
+            raise ValueError("엑셀에 워크시트가 없습니다.")
+
+        # 숨김 시트 스킵 옵션 (sheets_metadata는 calamine 버전에 따라 없을 수 있음)
+        hidden = set()
+        if XLSX_SKIP_HIDDEN_SHEETS:
+            for meta in getattr(wb, "sheets_metadata", None) or []:
+                if str(getattr(meta, "visible", "")).lower().endswith("hidden"):
+                    hidden.add(meta.name)
+
+        acc: List[str] = []
+        for name in wb.sheet_names:
+            if name in hidden:
+                continue
+
+            acc.append(f"\n### [Sheet] {name}")
+            rows = wb.get_sheet_by_name(name).to_python(skip_empty_area=True)
+
+            # 🔹 열 상한 캡을 슬라이싱으로 적용
+            if XLSX_MAX_COLS_PER_SHEET and XLSX_MAX_COLS_PER_SHEET > 0:
+                rows = (row[:XLSX_MAX_COLS_PER_SHEET] for row in rows)
+
+            self._append_xlsx_rows(acc, rows)
+
+        return "\n".join(acc)
+
+    def _read_xlsx_openpyxl(self, path: Path) -> str:  # python-calamine 미설치 시 대체 경로
         try:
             wb = openpyxl.load_workbook(str(path), data_only=True, read_only=True)
         except Exception as e:
@@ -196,43 +889,35 @@ class IngestService:
                 pass
 
             acc.append(f"\n### [Sheet] {ws.title}")
-            rows = 0
 
             # 🔹 열 상한 캡을 openpyxl 레벨에서 바로 적용
             iter_kwargs = {"values_only": True}
             if XLSX_MAX_COLS_PER_SHEET and XLSX_MAX_COLS_PER_SHEET > 0:
                 iter_kwargs["max_col"] = XLSX_MAX_COLS_PER_SHEET
 
-            for row in ws.iter_rows(**iter_kwargs):
-                if rows >= XLSX_MAX_ROWS_PER_SHEET:
-                    acc.append(f"...(truncated at {XLSX_MAX_ROWS_PER_SHEET} rows)")
-                    break
+            self._append_xlsx_rows(acc, ws.iter_rows(**iter_kwargs))
 
-                # 🔹 행 우측의 빈 열 트리밍: 실제 값이 있는 마지막 열까지만 사용
-                last = -1
-                # (열 캡이 적용된 범위 내에서만 검사)
-                for i, v in enumerate(row):
-                    sv = (str(v).strip() if v is not None else "")
-                    if sv != "":
-                        last = i
+        return "\n".join(acc)
 
-                if last < 0:
-                    continue  # 완전 빈 행은 스킵
+    def _append_xlsx_rows(self, acc: List[str], rows) -> None:  # 시트 행들을 "a | b | c" 줄로 변환해 acc에 추가
+        count = 0
+        for row in rows:
+            if count >= XLSX_MAX_ROWS_PER_SHEET:
+                acc.append(f"...(truncated at {XLSX_MAX_ROWS_PER_SHEET} rows)")
+                break
 
-                # 🔹 최종 사용할 열 폭 결정
-                width = last + 1
-                if XLSX_MAX_COLS_PER_SHEET and XLSX_MAX_COLS_PER_SHEET > 0:
-                    width = min(width, XLSX_MAX_COLS_PER_SHEET)
+            # 🔹 각 셀을 한 번만 문자열화 (열 캡이 적용된 범위 내)
+            row_vals = ["" if v is None else str(v).strip() for v in row]
 
-                # 🔹 최종 문자열 구성
-                row_vals = []
-                for v in row[:width]:
-                    row_vals.append("" if v is None else str(v).strip())
+            # 🔹 행 우측의 빈 열 트리밍: 실제 값이 있는 마지막 열까지만 사용
+            while row_vals and row_vals[-1] == "":
+                row_vals.pop()
 
-                acc.append(" | ".join(row_vals))
-                rows += 1
+            if not row_vals:
+                continue  # 완전 빈 행은 스킵
 
-        return "\n".join(acc)
+            acc.append(" | ".join(row_vals))
+            count += 1
 
     def load_text(self, file_path: str, verbose: bool = True) -> str:
         """확장자 + 실제 포맷 스니핑으로 적절한 파서 선택"""
@@ -278,23 +963,9 @@ class IngestService:
             return ""
 
     # ========================= Chroma 헬퍼 =========================
-    def get_chroma_collection(self):    # ChromaDB 컬렉션을 가져오거나 생성
-        try:
-            # ChromaDB 디렉토리 확인 및 생성
-            Path(CHROMA_PATH).mkdir(parents=True, exist_ok=True)
-            chroma = chromadb.PersistentClient(
-                path=CHROMA_PATH,
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    is_persistent=True,
-                ),
-            )
-            return chroma.get_or_create_collection(name=COLLECTION_NAME)
-        except Exception as e:
-            print(f"ChromaDB 초기화 오류: {str(e)}")
-            print("새로운 ChromaDB 인스턴스로 재시도 중...")
-            chroma = chromadb.Client()
-            return chroma.get_or_create_collection(name=COLLECTION_NAME)
+    def get_chroma_collection(self):    # ChromaDB 컬렉션을 가져오거나 생성 (프로세스 내 공유)
+        with _chroma_lock:
+            return _open_chroma_collection(CHROMA_PATH, COLLECTION_NAME)
 
     # ========================= 단일 파일 처리 =========================
     def ingest_single_file(self, file_path: str, show_preview: bool = True) -> bool:
@@ -308,14 +979,12 @@ class IngestService:
 
             print(f"✅ 파일 로드 완료, 전체 길이: {len(raw_text):,} chars")
 
-            # 2) 텍스트 청킹
-            chunks = self.text_splitter.split_text(raw_text)
-
-            # 각 청크의 텍스트 길이 출력
-            for i, c in enumerate(chunks):
-                print(f"  [Chunk {i}] {len(c):,} chars")
+            # 2~3) 텍스트 청킹 + 임베딩 생성 (청킹과 임베딩 요청을 겹쳐 실행)
+            print("⚙️ 청킹 및 임베딩 생성 중...")
+            chunks, embeddings = self.split_and_embed(raw_text)
 
-            print(f"🪓 청킹 완료 → 총 {len(chunks)} chunks")
+            # 청크 길이 요약 출력
+            _log_chunks(chunks)
             if not chunks:
                 print("❌ 청킹 결과가 비어 있습니다.")
                 return False
@@ -325,9 +994,6 @@ class IngestService:
                 for i, c in enumerate(chunks[:3]):
                     print(f"  [Chunk {i}] {c[:100]}...")
 
-            # 3) 임베딩 생성
-            print("⚙️ 임베딩 생성 중...")
-            embeddings = embed_texts_batched(chunks)
             if not embeddings:
                 print("❌ 임베딩 생성 실패(빈 입력).")
                 return False
@@ -351,9 +1017,10 @@ class IngestService:
             collection.add(
                 ids=ids,
                 metadatas=metadatas,
-                embeddings=embeddings,
+                embeddings=np.asarray(embeddings, dtype=np.float32),
                 documents=chunks,
             )
+            _notify_written()
 
             print(f"🎉 완료! {len(chunks)} chunks → Chroma collection '{COLLECTION_NAME}' 저장")
             return True
@@ -364,13 +1031,25 @@ class IngestService:
 
     # ========================= 다중 파일 처리 =========================
     def get_supported_files(self, folder_path: Path) -> List[Path]:  # 지원되는 파일 목록 추출
-        files: List[Path] = []
-        for file_path in folder_path.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
-                files.append(file_path)
-        return sorted(files)    # 정렬된 파일 목록 반환(파일명 순)
-
-    def process_single_file_batch(self, file_path: Path, collection) -> Tuple[int, bool]:  # 단일 파일 처리
+        return [path for path, _ in self.scan_supported_files(folder_path)]    # 정렬된 파일 목록 반환(파일명 순)
+
+    def scan_supported_files(self, folder_path: Path) -> List[Tuple[Path, int]]:  # (파일 경로, 바이트 크기) 목록 추출
+        # scandir의 DirEntry가 stat 정보를 들고 있어 파일당 추가 stat 호출이 없음
+        files: List[Tuple[Path, int]] = []
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in self.supported_extensions:
+                    files.append((folder_path / entry.name, entry.stat().st_size))
+        files.sort(key=lambda f: f[0].name)
+        return files
+
+    def process_single_file_batch(
+        self,
+        file_path: Path,
+        collection,
+        existing_ids: Optional[List[str]] = None,
+        writer: Optional["_ChromaWriter"] = None,
+    ) -> Tuple[int, bool]:  # 단일 파일 처리 (existing_ids: 미리 조회한 기존 청크 id, None이면 직접 조회 / writer: 있으면 저장을 백그라운드로 위임)
         print(f"\n🔄 처리 중: {file_path.name}")                    #(처리된 청크 수, 성공 여부)
         try:
             # 1) 파일 로드
@@ -381,45 +1060,34 @@ class IngestService:
 
             print(f"  ✅ 파일 로드 완료, 전체 길이: {len(raw_text):,} chars")
 
-            # 2) 텍스트 청킹
-            chunks = self.text_splitter.split_text(raw_text)
+            # 2~3) 텍스트 청킹 + 임베딩 생성 (청킹과 임베딩 요청을 겹쳐 실행)
+            print("  ⚙️ 청킹 및 임베딩 생성 중...")
+            chunks, embeddings = self.split_and_embed(raw_text)
 
-            # 각 청크의 텍스트 길이 출력
-            for i, c in enumerate(chunks):
-                print(f"  [Chunk {i}] {len(c):,} chars")
-
-            print(f"  🪓 청킹 완료 → 총 {len(chunks)} chunks")
+            # 청크 길이 요약 출력
+            _log_chunks(chunks, indent="  ")
             if not chunks:
                 print(f"  ⚠️ 청킹 결과가 없음: {file_path.name}")
                 return 0, False
 
-            # 3) 임베딩 생성
-            print(f"  ⚙️ 임베딩 생성 중... ({len(chunks)} chunks)")
-            embeddings = embed_texts_batched(chunks)
             if not embeddings:
                 print("  ⚠️ 임베딩 생성 실패(빈 입력)")
                 return 0, False
             print(f"  ✅ 임베딩 완료 → shape: {len(embeddings)} x {len(embeddings[0])}")
 
-            # 4) 기존 청크 삭제(중복 방지)
             file_name = file_path.name
-            existing = collection.get(where={"source": file_name})
-            if existing and existing.get("ids"):
-                collection.delete(ids=existing["ids"])
-                print(f"  🗑 기존 {len(existing['ids'])} 청크 삭제")
-
-            # 5) 새 데이터 추가
             base_id = file_path.stem
             ids = [f"{base_id}-{i}" for i in range(len(chunks))]
             metadatas = [{"source": file_name, "chunk_idx": i} for i in range(len(chunks))]
 
-            collection.add(
-                ids=ids,
-                metadatas=metadatas,
-                embeddings=embeddings,
-                documents=chunks,
-            )
+            # 4~5) 기존 청크 삭제 후 새 데이터 추가
+            if writer is not None:
+                # 쓰기는 전용 스레드에 맡기고 다음 파일 처리로 진행
+                writer.submit(file_name, existing_ids, ids, metadatas, embeddings, chunks)
+                print(f"  📥 저장 대기열 등록: {len(chunks)} chunks")
+                return len(chunks), True
 
+            self._write_chunks(collection, file_name, existing_ids, ids, metadatas, embeddings, chunks)
             print(f"  🎉 저장 완료! {len(chunks)} chunks → ChromaDB")
             return len(chunks), True
 
@@ -427,6 +1095,25 @@ class IngestService:
             print(f"  ❌ 처리 오류 ({file_path.name}): {str(e)}")
             return 0, False
 
+    def _write_chunks(self, collection, file_name, existing_ids, ids, metadatas, embeddings, chunks) -> None:
+        with self._collection_lock:
+            # 기존 청크 삭제(중복 방지)
+            if existing_ids is None:
+                existing = collection.get(where={"source": file_name}, include=[])
+                existing_ids = existing.get("ids") if existing else None
+            if existing_ids:
+                collection.delete(ids=existing_ids)
+                print(f"  🗑 기존 {len(existing_ids)} 청크 삭제 ({file_name})")
+
+            # 새 데이터 추가
+            collection.add(
+                ids=ids,
+                metadatas=metadatas,
+                embeddings=np.asarray(embeddings, dtype=np.float32),
+                documents=chunks,
+            )
+        _notify_written()
+
     # 폴더 내 모든 지원되는 파일들을 처리하여 ChromaDB에 저장
     def ingest_multiple_files(self, folder_path: str, clear_collection: bool = False) -> dict:
         folder = Path(folder_path)  # folder_path (str): 처리할 폴더 경로, clear_collection (bool): 처리 전 컬렉션 전체 삭제 여부 -> dict: 처리 결과 통계(성공/실패 파일 수, 총 청크 수, 소요 시간, 컬렉션 이름)
@@ -436,14 +1123,14 @@ class IngestService:
 
         print(f"📂 폴더 처리 시작: {folder.absolute()}")
 
-        files_to_process = self.get_supported_files(folder) # 지원되는 파일들 찾기
+        scanned = self.scan_supported_files(folder) # 지원되는 파일들 찾기 (크기 포함)
+        files_to_process = [file_path for file_path, _ in scanned]
         if not files_to_process:
             print("❌ 처리할 수 있는 파일이 없습니다. (지원 형식: .pdf, .docx, .xlsx)")
             return {"success": False, "error": "처리할 파일이 없음"}
 
         print(f"📋 처리 대상 파일 {len(files_to_process)}개:")
-        for i, file_path in enumerate(files_to_process, 1):
-            file_size = file_path.stat().st_size
+        for i, (file_path, file_size) in enumerate(scanned, 1):
             size_mb = file_size / (1024 * 1024)
             print(f"  {i:2d}. {file_path.name} ({size_mb:.1f}MB)")
 
@@ -459,35 +1146,71 @@ class IngestService:
                     all_data = collection.get()
                     if all_data.get("ids"):
                         collection.delete(ids=all_data["ids"])
+                        _notify_written()
                     print("✅ 기존 데이터 삭제 완료")
             except Exception as e:
                 print(f"⚠️ 기존 데이터 삭제 중 오류: {str(e)}")
 
+        # 처리 대상 파일들의 기존 청크 id를 한 번에 조회 (파일별 get 반복 방지)
+        existing_by_source: dict = {}
+        if not clear_collection:
+            try:
+                existing = collection.get(
+                    where={"source": {"$in": [p.name for p in files_to_process]}},
+                    include=["metadatas"],
+                )
+                for id_, meta in zip(existing.get("ids") or [], existing.get("metadatas") or []):
+                    existing_by_source.setdefault((meta or {}).get("source"), []).append(id_)
+            except Exception as e:
+                print(f"⚠️ 기존 청크 일괄 조회 실패, 파일별 조회로 대체: {str(e)}")
+                existing_by_source = None
+
         # 파일별 처리 통계
         total_chunks = 0
         successful_files = 0
         failed_files = 0
         start_time = time.time()
 
-        print(f"\n🚀 파일 처리 시작... (총 {len(files_to_process)}개)")
+        print(f"\n🚀 파일 처리 시작... (총 {len(files_to_process)}개, workers={INGEST_WORKERS})")
         print("=" * 60)
 
-        for i, file_path in enumerate(files_to_process, 1):
-            print(f"\n[{i}/{len(files_to_process)}] {file_path.name}")
-
-            chunks_count, success = self.process_single_file_batch(file_path, collection)
-
-            if success:
-                successful_files += 1
-                total_chunks += chunks_count
-            else:
-                failed_files += 1
-
-            progress = (i / len(files_to_process)) * 100    # 진행률 표시
-            print(f"  📊 진행률: {progress:.1f}% ({i}/{len(files_to_process)})")
-
-            if i < len(files_to_process):   # API 호출 제한을 위한 짧은 대기
-                time.sleep(0.5)
+        # 파일 단위 병렬 처리 (임베딩 호출 속도는 _embed_limiter가 제한)
+        # 파싱/임베딩은 작업 스레드, Chroma 쓰기는 단일 writer 스레드에서 파이프라인으로 진행
+        writer = _ChromaWriter(self, collection)
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, INGEST_WORKERS)) as executor:
+                futures = {
+                    executor.submit(
+                        self.process_single_file_batch,
+                        file_path,
+                        collection,
+                        None if existing_by_source is None else existing_by_source.get(file_path.name, []),
+                        writer,
+                    ): file_path
+                    for file_path in files_to_process
+                }
+                for i, future in enumerate(as_completed(futures), 1):
+                    chunks_count, success = future.result()
+
+                    if success:
+                        successful_files += 1
+                        total_chunks += chunks_count
+                    else:
+                        failed_files += 1
+
+                    progress = (i / len(files_to_process)) * 100    # 진행률 표시
+                    print(f"  📊 진행률: {progress:.1f}% ({i}/{len(files_to_process)}) - {futures[future].name}")
+        finally:
+            # 남은 쓰기를 모두 반영하고, 저장에 실패한 파일은 통계에서 실패로 이동
+            print("\n💾 저장 대기열 반영 중...")
+            writer.close()
+
+        for file_name, (chunks_count, err) in writer.failed.items():
+            print(f"  ❌ 저장 오류 ({file_name}): {err}")
+            successful_files -= 1
+            failed_files += 1
+            total_chunks -= chunks_count
+        print(f"  💾 저장 완료: {writer.written:,} chunks")
 
         elapsed_time = time.time() - start_time
 
@@ -514,13 +1237,16 @@ class IngestService:
 
 
 # ========================= 편의 함수 =========================
+# 편의 함수들이 공유하는 기본 서비스 인스턴스 (호출마다 새로 만들지 않음)
+_default_service = IngestService()
+
 # 단일 파일 임베딩 편의 함수
 def ingest_single_file(file_path: str, show_preview: bool = True) -> bool:
-    return IngestService().ingest_single_file(file_path, show_preview)
+    return _default_service.ingest_single_file(file_path, show_preview)
 
 # 다중 파일 임베딩 편의 함수
 def ingest_multiple_files(folder_path: str, clear_collection: bool = False) -> dict:
-    return IngestService().ingest_multiple_files(folder_path, clear_collection)
+    return _default_service.ingest_multiple_files(folder_path, clear_collection)
 
 
 # ========================= CLI =========================
@@ -6,7 +6,7 @@ RAG 문서 검색 & 답변 서비스 (LangChain + Chroma)
 변경 핵심
 1) 컨텍스트 길이 제한(MAX_CONTEXT_CHARS) 추가로 프롬프트 초과 방지
 2) 안정 유사도 변환: similarity = 1 / (1 + distance) (코사인 거리 가정)
-3) 헬스체크 시 private 속성 접근 제거 → 실제 검색 시도로 체크
+3) 헬스체크는 collection.count()로 확인 (임베딩 API 호출 없음)
 4) Document 임포트 경로 최신화 (langchain_core.documents)
 5) CHROMA_PATH 절대 경로화(로그 표시) + 환경변수 통일
 6) 모델 오버라이드 지원(메서드 인자 model)
@@ -15,17 +15,34 @@ RAG 문서 검색 & 답변 서비스 (LangChain + Chroma)
 """
 
 import os
-from typing import List, Tuple
-
+import time
+import logging
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
 from dotenv import load_dotenv
 
 # LangChain - LLM/Embeddings/VectorStore/Prompt/Parser
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_chroma import Chroma
-from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.tools import tool
-from langchain_core.documents import Document  # ✅ 최신 경로
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+
+import chromadb
+
+try:
+    from .internal_ingest import add_write_listener, get_or_create_hnsw_collection
+except ImportError:  # python internal_retrieve.py 로 직접 실행한 경우
+    from internal_ingest import add_write_listener, get_or_create_hnsw_collection
 
 # ─────────────────────────────────────────────────────────
 # 환경 변수 로드
@@ -41,90 +58,291 @@ COLLECTION_NAME = os.getenv("COLLECTION_NAME", "inside_data")
 EMBED_MODEL = os.getenv("EMBED_MODEL", "text-embedding-3-small")
 CHAT_MODEL = os.getenv("CHAT_MODEL", "gpt-4o-mini")  # ✅ 운영 기본값 권장
 MAX_CONTEXT_CHARS = int(os.getenv("MAX_CONTEXT_CHARS", "12000"))  # ✅ 프롬프트 길이 제한
+RAG_CACHE_SIZE = int(os.getenv("RAG_CACHE_SIZE", "2000"))  # 검색 결과 캐시 최대 항목 수
+RAG_CACHE_TTL = float(os.getenv("RAG_CACHE_TTL", "300"))  # 검색 결과 캐시 유효 시간(초)
+# 검색 결과 중복 제거 임계값 (앞 64단어 Jaccard 유사도가 이 값을 넘으면 중복으로 보고 제외, 1 이상이면 비활성)
+RAG_DEDUP_THRESHOLD = float(os.getenv("RAG_DEDUP_THRESHOLD", "0.85"))
+RAG_BATCH_WORKERS = max(1, int(os.getenv("RAG_BATCH_WORKERS", "4")))  # 배치 검색 동시 실행 수
+# 임베딩 백엔드: openai(기본) | local(sentence-transformers, GPU 자동 선택)
+# ⚠️ 질의와 컬렉션은 같은 모델로 임베딩되어야 하므로 local 사용 시 같은 모델로 적재한 컬렉션을 지정하세요.
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "openai").lower()
+LOCAL_EMBED_MODEL = os.getenv("LOCAL_EMBED_MODEL", "BAAI/bge-small-en-v1.5")
+LOCAL_EMBED_DEVICE = os.getenv("LOCAL_EMBED_DEVICE", "")  # 비우면 cuda → mps → cpu 순으로 자동 선택
+# 임베딩 영구 캐시 디렉터리 (SHA-256 키, 재시작 후에도 유지 / 비우면 비활성)
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "./.embed_cache")
+# 검색 후 Cross-Encoder 재정렬 모델 (비우면 비활성, 예: BAAI/bge-reranker-base)
+RAG_RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "")
+
+# 검색 경로 로그 (기본 WARNING: 오류만 출력, RAG_LOG_LEVEL=INFO/DEBUG 로 상세 로그)
+logger = logging.getLogger("rag.retrieve")
+logger.setLevel(os.getenv("RAG_LOG_LEVEL", "WARNING").upper())
 
 # ─────────────────────────────────────────────────────────
 # LangChain 컴포넌트 초기화
 # ─────────────────────────────────────────────────────────
-# 임베딩 함수 (OpenAI Embeddings 래퍼)
-_embeddings = OpenAIEmbeddings(model=EMBED_MODEL)
+def _local_device() -> str:
+    if LOCAL_EMBED_DEVICE:
+        return LOCAL_EMBED_DEVICE
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        if getattr(torch.backends, "mps", None) and torch.backends.mps.is_available():
+            return "mps"
+    except ImportError:
+        pass
+    return "cpu"
+
+
+def build_embeddings():
+    """EMBED_BACKEND에 맞는 LangChain 임베딩 객체 생성 (EMBED_CACHE_DIR이 있으면 디스크 캐시로 감쌈)"""
+    if EMBED_BACKEND == "local":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        underlying = HuggingFaceEmbeddings(
+            model_name=LOCAL_EMBED_MODEL,
+            model_kwargs={"device": _local_device()},
+            encode_kwargs={"batch_size": 64, "normalize_embeddings": True},
+        )
+        namespace = LOCAL_EMBED_MODEL
+    else:
+        underlying = OpenAIEmbeddings(model=EMBED_MODEL)
+        namespace = EMBED_MODEL
+
+    if not EMBED_CACHE_DIR:
+        return underlying
+    # 같은 텍스트는 재배포 후에도 API를 다시 호출하지 않음 (모델명으로 네임스페이스 분리)
+    store = LocalFileStore(os.path.abspath(EMBED_CACHE_DIR))
+    return CacheBackedEmbeddings.from_bytes_store(
+        underlying,
+        store,
+        namespace=namespace,
+        query_embedding_cache=True,
+        key_encoder="sha256",
+    )
+
+
+# 임베딩 함수 (기본: OpenAI Embeddings 래퍼)
+_embeddings = build_embeddings()
 
 # 벡터스토어 (Chroma 래퍼)
 # - persist_directory: CHROMA_PATH
 # - collection_name: COLLECTION_NAME
+# 컬렉션이 없을 때만 HNSW 설정(internal_ingest.HNSW_METADATA)으로 생성, 기존 컬렉션 메타데이터는 유지
+_chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+get_or_create_hnsw_collection(_chroma_client, COLLECTION_NAME)
 _vectorstore = Chroma(
+    client=_chroma_client,
     collection_name=COLLECTION_NAME,
     embedding_function=_embeddings,
-    persist_directory=CHROMA_PATH,
 )
 
 # LLM (ChatOpenAI 래퍼)
 _llm = ChatOpenAI(model=CHAT_MODEL, temperature=0)
 
 # 프롬프트 (시스템+사용자)
-_prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            "당신은 사내 문서를 기반으로 정확히 답하는 어시스턴트입니다. "
-            "주어진 컨텍스트에서만 정보를 추출하여 답변하고, "
-            "추측하지 말고 모르는 내용은 '모른다'고 명확히 말하세요. "
-            "가능한 한 출처 문서명과 함께 답변하세요.",
-        ),
-        (
-            "user",
-            "질문: {question}\n\n"
-            "참고 컨텍스트(여러 청크):\n{context}",
-        ),
-    ]
+# 변수는 question/context 뿐이므로 ChatPromptTemplate 대신 str.format으로 메시지를 바로 만든다
+SYSTEM_MSG = (
+    "당신은 사내 문서를 기반으로 정확히 답하는 어시스턴트입니다. "
+    "주어진 컨텍스트에서만 정보를 추출하여 답변하고, "
+    "추측하지 말고 모르는 내용은 '모른다'고 명확히 말하세요. "
+    "가능한 한 출처 문서명과 함께 답변하세요."
 )
+USER_TEMPLATE = "질문: {question}\n\n참고 컨텍스트(여러 청크):\n{context}"
+_SYSTEM_MESSAGE = SystemMessage(content=SYSTEM_MSG)
+
+
+def _format_messages(inputs: dict) -> list:
+    return [
+        _SYSTEM_MESSAGE,
+        HumanMessage(content=USER_TEMPLATE.format(question=inputs["question"], context=inputs["context"])),
+    ]
+
+
+_prompt = RunnableLambda(_format_messages)
 
 # 출력 파서
 _parser = StrOutputParser()
 
 
+@lru_cache(maxsize=8)
+def _get_llm(model: str) -> ChatOpenAI:
+    """모델 오버라이드용 ChatOpenAI 인스턴스 (모델명별 재사용)"""
+    return ChatOpenAI(model=model, temperature=0)
+
+
 # ─────────────────────────────────────────────────────────
 # 유틸
 # ─────────────────────────────────────────────────────────
 
-def _stable_similarity(distance: float) -> float:
-    """코사인 거리 가정 시 안정적 유사도 변환: 1 / (1 + d)."""
-    try:
-        d = float(distance)
-    except Exception:
-        d = 0.0
-    if d < 0:
-        d = 0.0
-    return 1.0 / (1.0 + d)
+# 컨텍스트 블록 구분자
+_SEP = "\n\n---\n\n"
+_SEP_LEN = len(_SEP)
+
+
+def _stable_similarity(d: float) -> float:
+    """코사인 거리 가정 시 안정적 유사도 변환: 1 / (1 + d). (음수 거리는 0으로 취급, 호출 측이 float 보장)"""
+    return 1.0 / (1.0 + d) if d > 0 else 1.0
+
+
+def _contexts_from_result(
+    documents: List[str], metadatas: List[dict], distances: List[float]
+) -> List[Tuple[str, dict]]:
+    """Chroma query 결과(질의 1개분)를 (page_content, meta) 튜플 목록으로 변환."""
+    contexts: List[Tuple[str, dict]] = []
+    for doc, meta, distance in zip(documents or [], metadatas or [], distances or []):
+        meta = dict(meta or {})
+        meta["similarity_score"] = _stable_similarity(float(distance))
+        contexts.append((doc or "", meta))
+    return contexts
+
+
+def _dedup_near_duplicates(
+    contexts: List[Tuple[str, dict]], threshold: float = RAG_DEDUP_THRESHOLD
+) -> List[Tuple[str, dict]]:
+    """거의 같은 청크(인접 청크 중복 등)는 유사도가 가장 높은 하나만 남긴다.
+    문서 앞 64단어 집합의 Jaccard 유사도가 threshold 초과면 중복으로 판단.
+    """
+    if threshold >= 1.0 or len(contexts) < 2:
+        return contexts
+    ranked = sorted(contexts, key=lambda x: x[1].get("similarity_score", 0.0), reverse=True)
+    kept: List[Tuple[str, dict]] = []
+    kept_sigs: List[frozenset] = []
+    for doc, meta in ranked:
+        sig = frozenset(doc.split()[:64])
+        if sig and any(len(sig & prev) / len(sig | prev) > threshold for prev in kept_sigs):
+            continue
+        kept.append((doc, meta))
+        kept_sigs.append(sig)
+    return kept
+
+
+@lru_cache(maxsize=1)
+def _get_reranker():
+    """RAG_RERANK_MODEL Cross-Encoder (최초 사용 시 로드)"""
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RAG_RERANK_MODEL, device=_local_device())
+
+
+def _rerank(query: str, contexts: List[Tuple[str, dict]]) -> List[Tuple[str, dict]]:
+    """Cross-Encoder 점수(meta["rerank_score"]) 내림차순으로 재정렬. 비활성이면 그대로 반환."""
+    if not RAG_RERANK_MODEL or len(contexts) < 2:
+        return contexts
+    scores = _get_reranker().predict([(query, doc) for doc, _ in contexts])
+    for (_, meta), score in zip(contexts, scores):
+        meta["rerank_score"] = float(score)
+    return sorted(contexts, key=lambda x: x[1]["rerank_score"], reverse=True)
+
+
+def _embed_queries(queries: List[str]) -> np.ndarray:
+    """질의 목록을 한 번의 embed_documents 요청으로 임베딩합니다. shape: (len(queries), dim)"""
+    return np.asarray(_embeddings.embed_documents(list(queries)), dtype=np.float32)
 
 
 def _truncate_context_blocks(blocks: List[Tuple[str, dict]], max_chars: int) -> str:
     """컨텍스트 블록을 유사도 순으로 정렬 후, max_chars 까지 누적하여 문자열 구성.
     blocks: [(doc, meta)] with meta["similarity_score"] 존재 가정
+    (재정렬을 거친 블록은 meta["rerank_score"] 기준으로 정렬)
     """
-    # 유사도 높은 순 정렬
-    sorted_blocks = sorted(
-        blocks,
-        key=lambda x: float(x[1].get("similarity_score", 0.0)),
-        reverse=True,
+    if not blocks:
+        return ""
+
+    # 유사도 높은 순 정렬 (동점은 입력 순서 유지)
+    scores = np.fromiter(
+        (float(meta.get("rerank_score", meta.get("similarity_score", 0.0))) for _, meta in blocks),
+        dtype=np.float64,
+        count=len(blocks),
     )
+    order = np.argsort(-scores, kind="stable")
+
+    parts = []
+    for i in order:
+        doc, meta = blocks[i]
+        get = meta.get
+        parts.append(f"[출처: {get('source', '알 수 없음')} / 청크: {get('chunk_idx', 'N/A')}]\n{doc}")
 
-    acc: List[str] = []
-    total = 0
-    sep = "\n\n---\n\n"
+    # 누적 길이(구분자 포함) 기준으로 max_chars 이하인 최장 접두부를 선택
+    lens = np.fromiter((len(p) for p in parts), dtype=np.int64, count=len(parts))
+    cum = np.cumsum(lens + _SEP_LEN) - _SEP_LEN
+    cutoff = int(np.searchsorted(cum, max_chars, side="right"))
 
-    for doc, meta in sorted_blocks:
-        header = f"[출처: {meta.get('source', '알 수 없음')} / 청크: {meta.get('chunk_idx', 'N/A')}]\n"
-        block = header + doc
-        add_len = len(block) + (len(sep) if acc else 0)
-        if total + add_len > max_chars:
-            break
-        if acc:
-            acc.append(sep)
-            total += len(sep)
-        acc.append(block)
-        total += len(block)
+    return _SEP.join(parts[:cutoff])
 
-    return "".join(acc)
+
+class QueryCache:
+    """검색 결과용 스레드 안전 LRU + TTL 캐시.
+
+    키는 (컬렉션, top_k, 질의, 버전)의 blake2b 다이제스트입니다.
+    ingest로 컬렉션이 바뀌면 bump_version()을 호출해 이전 항목을 모두 무효화합니다.
+    """
+
+    def __init__(self, max_size: int = RAG_CACHE_SIZE, ttl_seconds: float = RAG_CACHE_TTL):
+        self.max_size = max(0, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self._data: "OrderedDict[bytes, Tuple[float, List[Tuple[str, dict]]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, query: str, top_k: int) -> bytes:
+        raw = f"{COLLECTION_NAME}|{top_k}|{self._version}|{query}".encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).digest()
+
+    def get(self, query: str, top_k: int) -> Optional[List[Tuple[str, dict]]]:
+        with self._lock:
+            key = self._key(query, top_k)
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, contexts = entry
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return list(contexts)
+
+    def put(self, query: str, top_k: int, contexts: List[Tuple[str, dict]]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            key = self._key(query, top_k)
+            self._data[key] = (time.monotonic(), list(contexts))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def bump_version(self) -> None:
+        """컬렉션 변경 시 호출: 기존 키를 모두 무효화하고 저장 공간을 비웁니다."""
+        with self._lock:
+            self._version += 1
+            self._data.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+# 모든 RetrieveService 인스턴스가 공유하는 검색 결과 캐시
+_query_cache = QueryCache()
 
 
 class RetrieveService:
@@ -135,43 +353,111 @@ class RetrieveService:
         self.llm = _llm
         self.prompt = _prompt
         self.parser = _parser
+        self.cache = _query_cache
+        # LCEL: prompt → llm → parser (기본 모델 체인은 한 번만 구성)
+        self._default_chain = self.prompt | self.llm | self.parser
 
     # ========================= 문서 검색 =========================
 
     def retrieve_documents(self, query: str, top_k: int = 3) -> List[Tuple[str, dict]]:
         """
-        LangChain의 vectorstore 래퍼로 유사도 검색 수행.
-        similarity_search_with_score를 사용해 점수(distance)를 함께 받습니다.
-        (Chroma의 score는 보통 'cosine distance'로, 값이 작을수록 유사.)
+        단일 질의 검색. retrieve_documents_batch([query])의 얇은 래퍼입니다.
+        (Chroma의 distance는 보통 'cosine distance'로, 값이 작을수록 유사.)
         """
-        try:
-            print(f"🔍 문서 검색: '{query}' (상위 {top_k}개)")
+        contexts = self.retrieve_documents_batch([query], top_k)[0]
+        if not contexts:
+            logger.info("❌ 관련 문서를 찾지 못했습니다.")
+            return []
 
-            results: List[Tuple[Document, float]] = self.vectorstore.similarity_search_with_score(
-                query, k=top_k
-            )
-            if not results:
-                print("❌ 관련 문서를 찾지 못했습니다.")
-                return []
-
-            contexts: List[Tuple[str, dict]] = []
-            print(f"✅ {len(results)}개의 관련 문서를 찾았습니다.")
-            for i, (doc, distance) in enumerate(results, start=1):
-                similarity = _stable_similarity(distance)  # ✅ 안정 유사도 변환
-                meta = dict(doc.metadata or {})
-                meta["similarity_score"] = similarity  # 보고/정렬용
-                preview = (doc.page_content[:80] + "...") if len(doc.page_content) > 80 else doc.page_content
-                print(
-                    f"  [Rank {i}] 유사도={similarity:.4f}, "
-                    f"source={meta.get('source')}, chunk={meta.get('chunk_idx')}"
+        logger.info("✅ %d개의 관련 문서를 찾았습니다.", len(contexts))
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, (doc, meta) in enumerate(contexts, start=1):
+                preview = (doc[:80] + "...") if len(doc) > 80 else doc
+                logger.debug(
+                    "  [Rank %d] 유사도=%.4f, source=%s, chunk=%s\n          내용: %s",
+                    i, meta["similarity_score"], meta.get("source"), meta.get("chunk_idx"), preview,
                 )
-                print(f"          내용: {preview}")
-                contexts.append((doc.page_content, meta))
+        return contexts
 
-            return contexts
+    def retrieve_documents_batch(
+        self, queries: List[str], top_k: int = 3
+    ) -> List[List[Tuple[str, dict]]]:
+        """
+        여러 질의를 한 번에 검색합니다. 결과는 입력 순서와 동일한 목록의 목록입니다.
+        - 캐시에 있는 질의는 바로 반환
+        - 나머지는 embed_documents 1회로 임베딩한 뒤 Chroma collection.query에 직접 전달
+          (similarity_search_with_score처럼 질의마다 임베딩 API를 왕복하지 않음)
+        - 실패한 질의는 빈 목록으로 채웁니다.
+        """
+        results: List[List[Tuple[str, dict]]] = [[] for _ in queries]
+        pending: dict = {}  # query -> 결과를 채울 인덱스 목록 (중복 질의는 1회만 검색)
+        for i, q in enumerate(queries):
+            cached = self.cache.get(q, top_k)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(q, []).append(i)
+
+        if not pending:
+            logger.info("⚡ 검색 캐시 적중: %d개 질의 (상위 %d개)", len(queries), top_k)
+            return results
+
+        miss_queries = list(pending)
+        if len(miss_queries) == 1:
+            logger.info("🔍 문서 검색: '%s' (상위 %d개)", miss_queries[0], top_k)
+        else:
+            logger.info("🔍 문서 검색: %d개 질의 (상위 %d개)", len(miss_queries), top_k)
+
+        try:
+            embeddings = _embed_queries(miss_queries)
         except Exception as e:
-            print(f"❌ 문서 검색 중 오류 발생: {e}")
-            return []
+            logger.error("❌ 질의 임베딩 중 오류 발생: %s", e)
+            return results
+
+        collection = self.vectorstore._collection
+
+        def _search(start: int, end: int):
+            return start, collection.query(
+                query_embeddings=embeddings[start:end].tolist(),
+                n_results=top_k,
+                include=["documents", "metadatas", "distances"],
+            )
+
+        # 질의가 많으면 RAG_BATCH_WORKERS 개 구간으로 나눠 병렬 조회, 적으면 한 번에 조회
+        n = len(miss_queries)
+        step = max(1, -(-n // RAG_BATCH_WORKERS))
+        spans = [(i, min(i + step, n)) for i in range(0, n, step)]
+        if len(spans) == 1:
+            jobs = []
+            try:
+                jobs.append(_search(0, n))
+            except Exception as e:
+                logger.error("❌ 문서 검색 중 오류 발생: %s", e)
+        else:
+            with ThreadPoolExecutor(max_workers=len(spans)) as pool:
+                futures = [pool.submit(_search, a, b) for a, b in spans]
+                jobs = []
+                for fut in futures:
+                    try:
+                        jobs.append(fut.result())
+                    except Exception as e:
+                        logger.error("❌ 문서 검색 중 오류 발생: %s", e)
+
+        for start, res in jobs:
+            for j, (docs, metas, dists) in enumerate(
+                zip(res["documents"], res["metadatas"], res["distances"])
+            ):
+                q = miss_queries[start + j]
+                contexts = _dedup_near_duplicates(_contexts_from_result(docs, metas, dists))
+                try:
+                    contexts = _rerank(q, contexts)
+                except Exception as e:
+                    logger.error("❌ 재정렬 중 오류 발생(유사도 순 유지): %s", e)
+                self.cache.put(q, top_k, contexts)
+                for i in pending[q]:
+                    results[i] = list(contexts)
+
+        return results
 
     # ========================= 답변 생성 =========================
 
@@ -184,20 +470,22 @@ class RetrieveService:
 
         try:
             model_label = model or getattr(self.llm, "model", getattr(self.llm, "model_name", "unknown"))
-            print(f"⚙️ 답변 생성 중... ({len(contexts)}개 컨텍스트, 모델: {model_label})")
+            logger.info("⚙️ 답변 생성 중... (%d개 컨텍스트, 모델: %s)", len(contexts), model_label)
 
             # ✅ 컨텍스트 트렁케이션 (유사도 순)
             context_text = _truncate_context_blocks(contexts, max_chars=MAX_CONTEXT_CHARS)
 
-            # LCEL: prompt → llm → parser
-            used_llm = self.llm if model is None else ChatOpenAI(model=model, temperature=0)
-            chain = self.prompt | used_llm | self.parser
+            chain = (
+                self._default_chain
+                if model is None
+                else self.prompt | _get_llm(model) | self.parser
+            )
             answer: str = chain.invoke({"question": query, "context": context_text})
 
-            print("✅ 답변 생성 완료")
+            logger.info("✅ 답변 생성 완료")
             return answer
         except Exception as e:
-            print(f"❌ 답변 생성 중 오류 발생: {e}")
+            logger.error("❌ 답변 생성 중 오류 발생: %s", e)
             return f"답변 생성 중 오류가 발생했습니다: {e}"
 
     # ========================= 통합 RAG 처리 =========================
@@ -206,7 +494,7 @@ class RetrieveService:
         self, query: str, top_k: int = 4, model: str | None = None, show_sources: bool = True
     ) -> str:
         """질의 → 검색 → 생성까지 통합 실행"""
-        print(f"\n🔍 질의: {query}")
+        logger.info("🔍 질의: %s", query)
 
         contexts = self.retrieve_documents(query, top_k)
         if not contexts:
@@ -253,36 +541,77 @@ def rag_search_tool(query: str) -> str:
     내부 문서에서 정보를 검색하고 답변을 생성하는 RAG 도구입니다.
     사내 문서, 정책, 절차, 가이드라인 등에 대한 질문에 답변합니다.
     """
-    print(f"\n📚 RAG 도구 실행: '{query}'")
+    logger.info("📚 RAG 도구 실행: '%s'", query)
     return _retrieve_service.query_rag(query, top_k=3)
 
 
 rag_tools = [rag_search_tool]
 
 
+def get_cache_stats() -> dict:
+    """검색 결과 캐시 통계 (hits/misses/evictions 등)."""
+    return _query_cache.get_stats()
+
+
+def bump_version() -> None:
+    """문서 적재 후 호출하여 검색 결과 캐시를 무효화합니다.
+
+    같은 프로세스에서 internal_ingest로 적재하면 자동으로 호출됩니다.
+    """
+    _query_cache.bump_version()
+
+
+add_write_listener(bump_version)
+
+
+def set_ef_search(ef: int) -> None:
+    """질의 시 HNSW 탐색 폭(hnsw:search_ef)을 변경합니다.
+
+    값을 올리면 recall이 좋아지는 대신 검색 지연이 늘어납니다.
+    거리 함수(hnsw:space)는 생성 후 변경할 수 없으므로 modify 대상에서 제외합니다.
+    """
+    collection = _vectorstore._collection
+    metadata = {k: v for k, v in (collection.metadata or {}).items() if k != "hnsw:space"}
+    metadata["hnsw:search_ef"] = int(ef)
+    collection.modify(metadata=metadata)
+    # 검색 결과가 달라질 수 있으므로 캐시 무효화
+    _query_cache.bump_version()
+
+
 # ========================= 편의 함수들 =========================
 
+def get_retrieve_service() -> RetrieveService:
+    """모듈 공용 RetrieveService (도구·편의 함수가 같은 인스턴스와 캐시를 공유)"""
+    return _retrieve_service
+
+
 def retrieve_documents(query: str, top_k: int = 3) -> List[Tuple[str, dict]]:
-    return RetrieveService().retrieve_documents(query, top_k)
+    return _retrieve_service.retrieve_documents(query, top_k)
+
+
+def retrieve_documents_batch(queries: List[str], top_k: int = 3) -> List[List[Tuple[str, dict]]]:
+    return _retrieve_service.retrieve_documents_batch(queries, top_k)
 
 
 def generate_answer(query: str, contexts: List[Tuple[str, dict]], model: str | None = None) -> str:
-    return RetrieveService().generate_answer(query, contexts, model)
+    return _retrieve_service.generate_answer(query, contexts, model)
 
 
 def query_rag(query: str, top_k: int = 4, model: str | None = None) -> str:
-    return RetrieveService().query_rag(query, top_k, model)
+    return _retrieve_service.query_rag(query, top_k, model)
 
 
 # ========================= CLI =========================
 
 def _healthcheck_vectorstore() -> bool:
-    """✅ private 속성 접근 없이 헬스체크: 더미 검색 시도"""
+    """헬스체크: 컬렉션 문서 수 조회 (임베딩 호출·검색 없이 로컬 메타데이터만 확인)
+    _collection은 LangChain Chroma가 노출하는 chromadb Collection이며, count()는 공식 API입니다.
+    """
     try:
-        _ = _vectorstore.similarity_search("__healthcheck__", k=1)
+        _ = _vectorstore._collection.count()
         return True
     except Exception as e:
-        print(f"❌ Chroma 헬스체크 실패: {e}")
+        logger.error("❌ Chroma 헬스체크 실패: %s", e)
         return False
 
 
@@ -301,14 +630,35 @@ def main():
         print("먼저 ingest 파이프라인으로 문서를 적재하세요.")
         return
 
-    RetrieveService().interactive_mode()
+    _retrieve_service.interactive_mode()
+
+
+# 임베딩 캐시 예열용 기본 질의 (--warm 에 파일을 주지 않으면 사용)
+_WARM_QUERIES = ["기록물 관리", "관리기준표가 뭐야?", "야간 및 휴일근로 관련 규정 알려줘"]
+
+
+def warm_embedding_cache(queries: List[str]) -> int:
+    """자주 묻는 질의를 미리 임베딩해 디스크 캐시에 저장. 반환: 임베딩한 질의 수"""
+    queries = [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+    if queries:
+        _embed_queries(queries)
+    return len(queries)
 
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "--test":
+    if len(sys.argv) > 1 and sys.argv[1] == "--warm":
+        # 사용법: python internal_retrieve.py --warm [질의 목록 파일(한 줄에 하나)]
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], encoding="utf-8") as f:
+                warm_queries = f.read().splitlines()
+        else:
+            warm_queries = _WARM_QUERIES
+        count = warm_embedding_cache(warm_queries)
+        print(f"🔥 임베딩 캐시 예열 완료: {count}개 질의 → {os.path.abspath(EMBED_CACHE_DIR or '.')}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "--test":
         print("🧪 테스트 모드: 간단 질의 3개 실행")
-        for q in ["기록물 관리", "관리기준표가 뭐야?", "야간 및 휴일근로 관련 규정 알려줘"]:
+        for q in _WARM_QUERIES:
             print("\nQ:", q)
             print(query_rag(q))
             print("-" * 60)
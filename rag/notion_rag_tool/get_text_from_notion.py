@@ -1,19 +1,249 @@
+import io
 import os
-import requests
+import zlib
+import hashlib
+import asyncio
+import threading
 import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import httpx
+import orjson
 from dotenv import load_dotenv
-from notion_client import Client
-from langchain_community.document_loaders import NotionDBLoader
-from openai import OpenAI
+from notion_client import Client, AsyncClient, APIResponseError
+from openai import OpenAI, BadRequestError
+# 블록/속성 → 텍스트 변환은 순수 함수 모듈로 분리 (mypyc 컴파일 대상)
+from notion_render import render_block, render_table_markdown, get_property_value
 
 load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 START_PAGE_ID = '264120560ff680198c0fefbbe17bfc2c' # 시작 페이지 ID. 나중에 Frontend에서 받아올 것
 
+
+async def _use_orjson(response: httpx.Response) -> None:
+    """notion_client가 호출하는 response.json()을 orjson 파싱으로 교체 (bytes에서 바로 파싱, str 디코딩 생략)"""
+    response.json = lambda **kwargs: orjson.loads(response.content)
+
+
 notion = Client(auth=NOTION_TOKEN)
 openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# 동시에 보내는 Notion API 요청 수 상한 (Notion 통합 토큰당 평균 3 req/s 제한)
+NOTION_CONC = int(os.getenv("NOTION_CONC", "3"))
+# 429(rate_limited) 응답 시 최대 재시도 횟수
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+# 이미지 다운로드/GPT 분석을 동시에 처리하는 스레드 수 (OpenAI SDK 클라이언트는 스레드 안전)
+NOTION_IMAGE_WORKERS = int(os.getenv("NOTION_IMAGE_WORKERS", "8"))
+_image_executor = ThreadPoolExecutor(max_workers=NOTION_IMAGE_WORKERS, thread_name_prefix="notion-image")
+
+# 이미지 다운로드용 공유 HTTP/2 클라이언트 (스레드 안전, 다운로드 간 TLS 세션/커넥션 재사용)
+_http = httpx.Client(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=32),
+    timeout=30,
+    follow_redirects=True,
+)
+
+# 재적재 시 재사용할 디스크 캐시 (비우면 비활성)
+# - 이미지 분석 결과: (block_id, last_edited_time) 키 → 이미지가 바뀌지 않았으면 GPT 호출 생략
+# - NOTION_CACHE_BLOCKS=true 이면 자식 블록 목록도 (block_id, 부모의 last_edited_time) 키로 저장
+#   (Notion은 자식 블록만 수정된 경우 부모의 last_edited_time을 갱신하지 않을 수 있어 기본 비활성)
+NOTION_CACHE_DIR = os.getenv("NOTION_CACHE_DIR", "./.notion_cache")
+NOTION_CACHE_BLOCKS = os.getenv("NOTION_CACHE_BLOCKS", "false").lower() == "true"
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def _get_disk_cache():
+    """diskcache.Cache 지연 생성 (미설치/비활성이면 None)"""
+    global _disk_cache
+    if not NOTION_CACHE_DIR:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            try:
+                import diskcache
+                _disk_cache = diskcache.Cache(NOTION_CACHE_DIR)
+            except Exception as e:
+                print(f"⚠️ Notion 디스크 캐시 사용 불가: {e}")
+                _disk_cache = False
+        return _disk_cache or None
+
+
+def _disk_cache_get(key: str):
+    cache = _get_disk_cache()
+    if cache is None:
+        return None
+    blob = cache.get(key)
+    return orjson.loads(zlib.decompress(blob)) if blob is not None else None
+
+
+def _disk_cache_set(key: str, value) -> None:
+    cache = _get_disk_cache()
+    if cache is not None:
+        # JSON 직렬화 후 압축 저장 (대형 워크스페이스에서도 캐시 크기 억제)
+        cache.set(key, zlib.compress(orjson.dumps(value), 6))
+
+# 비동기 클라이언트/세마포어는 이벤트 루프에 묶이므로 루프마다 새로 만든다
+_async_notion = None
+_notion_sem = None
+_async_loop = None
+
+
+def _get_async_notion():
+    """현재 이벤트 루프용 (AsyncClient, Semaphore) 반환"""
+    global _async_notion, _notion_sem, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_loop is not loop:
+        # 블록/데이터베이스 조회가 모두 하나의 keep-alive(HTTP/2) 커넥션 풀을 공유
+        _async_notion = AsyncClient(
+            auth=NOTION_TOKEN,
+            client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=NOTION_CONC, max_keepalive_connections=NOTION_CONC),
+                # 대형 블록/데이터베이스 응답의 JSON 파싱 비용 절감
+                event_hooks={"response": [_use_orjson]},
+            ),
+            timeout_ms=120_000,
+        )
+        _notion_sem = asyncio.Semaphore(NOTION_CONC)
+        _async_loop = loop
+    return _async_notion, _notion_sem
+
+
+async def _call_notion(method, **kwargs):
+    """세마포어로 동시 요청 수를 제한하고, 429는 Retry-After(없으면 지수 백오프)만큼 쉬었다 재시도"""
+    _, sem = _get_async_notion()
+    for attempt in range(NOTION_MAX_RETRIES + 1):
+        try:
+            async with sem:
+                return await method(**kwargs)
+        except APIResponseError as e:
+            if e.code != "rate_limited" or attempt == NOTION_MAX_RETRIES:
+                raise
+            headers = getattr(e, "headers", None) or {}
+            try:
+                delay = float(headers.get("retry-after", ""))
+            except ValueError:
+                delay = 2 ** attempt
+            await asyncio.sleep(delay)
+
+
+# 같은 블록/데이터베이스를 여러 번 만나도 API는 한 번만 호출하도록 결과를 기억
+_block_cache: dict = {}     # block_id -> 자식 블록 목록
+_database_cache: dict = {}  # database_id -> 페이지 목록
+_inflight: dict = {}        # (캐시 이름, id) -> 조회 중임을 알리는 asyncio.Event
+
+
+def clear_notion_cache():
+    """블록/데이터베이스 메모이제이션 캐시 비우기 (워크스페이스를 다시 적재하기 전에 호출)"""
+    _block_cache.clear()
+    _database_cache.clear()
+
+
+async def _memoized(cache: dict, cache_name: str, key: str, fetch):
+    """cache[key]가 없으면 fetch()로 채운다. 같은 key를 동시에 요청하면 첫 요청만 API를 호출하고 나머지는 기다린다."""
+    while key not in cache:
+        event = _inflight.get((cache_name, key))
+        if event is None:
+            break
+        await event.wait()
+    else:
+        return cache[key]
+
+    event = asyncio.Event()
+    _inflight[(cache_name, key)] = event
+    try:
+        value = await fetch()
+        cache[key] = value  # 실패한 조회는 저장하지 않음 (대기자는 다시 조회)
+        return value
+    finally:
+        del _inflight[(cache_name, key)]
+        event.set()
+
+
+async def _list_block_children(block_id: str, last_edited_time: str | None = None) -> list:
+    """블록의 모든 자식 블록을 가져옴 (메모이제이션, NOTION_CACHE_BLOCKS면 디스크 캐시도 사용)"""
+    async def _fetch():
+        disk_key = f"children:{block_id}:{last_edited_time}" if NOTION_CACHE_BLOCKS and last_edited_time else None
+        if disk_key:
+            cached = await asyncio.to_thread(_disk_cache_get, disk_key)
+            if cached is not None:
+                return cached
+        blocks = await _fetch_block_children(block_id)
+        if disk_key:
+            await asyncio.to_thread(_disk_cache_set, disk_key, blocks)
+        return blocks
+
+    return await _memoized(_block_cache, "blocks", block_id, _fetch)
+
+
+async def _query_database(database_id: str) -> list:
+    """데이터베이스의 모든 페이지를 가져옴 (메모이제이션)"""
+    return await _memoized(_database_cache, "databases", database_id, lambda: _fetch_database_pages(database_id))
+
+
+def iter_children(block_id: str):
+    """블록의 자식 블록을 페이지 단위(최대 100개)로 받아 하나씩 yield (동기 클라이언트)"""
+    start_cursor = None
+    while True:
+        response = notion.blocks.children.list(
+            block_id=block_id,
+            start_cursor=start_cursor,
+            page_size=100
+        )
+        yield from response.get("results", [])
+        if not response.get("has_more"):
+            break
+        start_cursor = response.get("next_cursor")
+
+
+async def _aiter_paginated(method, **kwargs):
+    """커서 기반 목록 API를 최대 page_size(100)로 순회하며 결과를 하나씩 yield
+
+    응답을 받자마자 다음 커서 요청을 먼저 보내 두고 현재 페이지를 넘겨주므로,
+    호출 측이 결과를 처리하는 동안 다음 페이지 요청이 진행된다 (더블 버퍼링).
+    """
+    response = await _call_notion(method, page_size=100, **kwargs)
+    while True:
+        next_request = None
+        if response.get("has_more"):
+            next_request = asyncio.ensure_future(
+                _call_notion(method, start_cursor=response.get("next_cursor"), page_size=100, **kwargs)
+            )
+        try:
+            for item in response.get("results", []):
+                yield item
+        except BaseException:
+            # 호출 측이 순회를 중단하면 미리 보낸 요청도 취소
+            if next_request is not None:
+                next_request.cancel()
+            raise
+        if next_request is None:
+            break
+        response = await next_request
+
+
+async def aiter_children(block_id: str):
+    """iter_children의 비동기 버전 (AsyncClient, NOTION_CONC 동시 요청 제한 + 429 재시도)"""
+    client, _ = _get_async_notion()
+    async for block in _aiter_paginated(client.blocks.children.list, block_id=block_id):
+        yield block
+
+
+async def _fetch_block_children(block_id: str) -> list:
+    """블록의 모든 자식 블록을 가져옴 - pagination 처리"""
+    return [block async for block in aiter_children(block_id)]
+
+
+async def _fetch_database_pages(database_id: str) -> list:
+    """데이터베이스의 모든 페이지를 가져옴 - pagination 처리"""
+    client, _ = _get_async_notion()
+    return [page async for page in _aiter_paginated(client.databases.query, database_id=database_id)]
+
 # 전처리된 데이터를 저장할 전역 리스트들
 processed_images = []
 processed_tables = []
@@ -21,47 +251,76 @@ processed_databases = []
 
 #-------------------------------------------------------------------------------------------------------------------#
 
+def _write_all(fd: int, data: bytes) -> None:
+    """os.write는 일부만 쓸 수 있으므로 전부 쓸 때까지 반복"""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
 def download_image_temporarily(image_url, block_id):
-    """이미지를 임시로 다운로드하는 함수"""
+    """이미지를 임시로 다운로드하는 함수 (임시 파일 경로, 내용 해시) 반환, 실패 시 (None, None)"""
     try:
-        # 이미지 다운로드
-        response = requests.get(image_url)
-        response.raise_for_status()
-        
-        # 임시 파일 생성
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-        # macOS/Linux에서는 NamedTemporaryFile을 사용하면 되지만, Windows에서는 임시 파일 생성이 좀 더 복잡함.
-        # 이를 해결하기 위해서는 tempfile.mkstemp() 또는 tempfile.TemporaryFile()를 사용할 수 있음.
-        # 하지만 이 경우 파일 삭제 처리가 필요함.
+        # 임시 파일 생성 - 파이썬 파일 객체 버퍼 없이 OS 파일 디스크립터에 바로 기록
+        # (mkstemp는 Windows에서도 동작하며, 사용 후 delete_temporary_file로 삭제)
         # macOS/Linux: 보통 /tmp/ 디렉토리
         # Windows: 보통 C:\Users\[사용자명]\AppData\Local\Temp\ 디렉토리
-        temp_file.write(response.content)
-        temp_file.close()
+        fd, temp_path = tempfile.mkstemp(suffix='.jpg')
+
+        # 이미지 다운로드 - 전체를 메모리에 올리지 않고 64KB 단위로 파일에 기록하면서 내용 해시 계산
+        hasher = hashlib.blake2b(digest_size=16)
+        try:
+            with _http.stream("GET", image_url) as response:
+                response.raise_for_status()
+                for chunk in response.iter_bytes(65536):
+                    hasher.update(chunk)
+                    _write_all(fd, chunk)
+        except Exception:
+            os.close(fd)
+            os.remove(temp_path)
+            raise
+        os.close(fd)
         
-        print(f"이미지 다운로드 완료: {temp_file.name}")
-        return temp_file.name
+        print(f"이미지 다운로드 완료: {temp_path}")
+        return temp_path, hasher.hexdigest()
         
     except Exception as e:
         print(f"이미지 다운로드 중 오류 발생: {e}")
-        return None
+        return None, None
 
-def analyze_image_with_gpt(image_path):
-    """gpt-4o-mini를 사용해서 이미지를 분석하는 함수"""
-    try:
-        # 이미지 파일을 base64로 인코딩해서 GPT에 전송
-        with open(image_path, "rb") as image_file:
-            import base64
-            base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text", 
-                            "text": """
+# 같은 이미지(로고, 반복 스크린샷 등)는 한 번만 분석하도록 URL/내용 해시 기준으로 설명을 기억 (디스크 캐시에도 저장)
+# - "url:<쿼리스트링 제외 URL>": Notion 서명 URL은 조회마다 쿼리만 바뀌므로 경로 부분으로 비교
+# - "hash:<blake2b>": 다운로드 경로에서 URL은 달라도 내용이 같은 이미지
+_image_desc_cache: dict[str, str] = {}
+_image_key_locks: dict[str, threading.Lock] = {}
+_image_key_locks_guard = threading.Lock()
+
+
+def _image_url_key(image_url: str) -> str:
+    return "url:" + image_url.split("?", 1)[0]
+
+
+def _image_desc_get(key: str):
+    desc = _image_desc_cache.get(key)
+    if desc is None:
+        desc = _disk_cache_get("image_desc:" + key)
+        if desc is not None:
+            _image_desc_cache[key] = desc
+    return desc
+
+
+def _image_desc_set(key: str, desc: str) -> None:
+    _image_desc_cache[key] = desc
+    _disk_cache_set("image_desc:" + key, desc)
+
+
+def _image_key_lock(key: str) -> threading.Lock:
+    """같은 이미지를 여러 스레드가 동시에 분석하지 않도록 키별 락 반환"""
+    with _image_key_locks_guard:
+        return _image_key_locks.setdefault(key, threading.Lock())
+
+# 이미지 분석 지시문 (모든 이미지 요청에서 같은 system 메시지로 재사용 → 프롬프트 캐시 적중)
+VISION_PROMPT = """
 **Role**
 
 You are an expert AI that precisely analyzes and interprets images. Your task is to perform a multifaceted and in-depth analysis of a given image and provide a detailed, structured explanation of the results. Please write everything, including your final answer, in Korean.
@@ -159,29 +418,87 @@ Based on the detailed analysis above, draw a final conclusion about the image as
 - **Theme and Interpretation:** Add your overall interpretation of what you believe the image's core theme or message is, and what emotions or thoughts it evokes in the viewer.
 
 **Now, begin your analysis of the provided image.**
-                            """
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_completion_tokens=2000
-        )
+"""
+VISION_PROMPT_CACHE_KEY = "notion_vision_v1"
+VISION_MAX_TOKENS = int(os.getenv("NOTION_VISION_MAX_TOKENS", "2000"))
 
-        # GPT 응답에서 텍스트 추출
-        description = response.choices[0].message.content
-        print(f"이미지 분석 완료: {len(description)}자의 설명 생성됨")
-        return description
-        
+def _b64encode_to_str(data: bytes) -> str:
+    """base64 인코딩 (pybase64의 SIMD 구현이 있으면 사용, 없으면 표준 라이브러리)"""
+    try:
+        import pybase64
+        return pybase64.b64encode_as_string(data)
+    except ImportError:
+        import base64
+        return base64.b64encode(data).decode('ascii')
+
+# data URL로 보낼 이미지의 긴 변 최대 크기 (gpt-4o-mini가 어차피 축소하므로 원본 해상도는 전송 낭비)
+NOTION_IMAGE_MAX_SIDE = int(os.getenv("NOTION_IMAGE_MAX_SIDE", "1024"))
+
+def _shrink_image_bytes(image_path) -> bytes:
+    """Pillow가 있으면 긴 변 NOTION_IMAGE_MAX_SIDE px, JPEG(q85)로 재인코딩 (없거나 실패하면 원본 바이트)"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return Path(image_path).read_bytes()
+    try:
+        with Image.open(image_path) as img:
+            img.thumbnail((NOTION_IMAGE_MAX_SIDE, NOTION_IMAGE_MAX_SIDE), Image.LANCZOS)
+            if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+                # 투명 배경은 흰색으로 합성 (JPEG는 알파 채널 미지원)
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=85, optimize=True)
+            return buffer.getvalue()
+    except Exception as e:
+        print(f"이미지 축소 실패, 원본 사용: {e}")
+        return Path(image_path).read_bytes()
+
+def image_file_to_data_url(image_path):
+    """로컬 이미지 파일을 base64 data URL로 변환 (URL을 직접 넘길 수 없을 때만 사용, 축소 후 인코딩)"""
+    base64_image = _b64encode_to_str(_shrink_image_bytes(image_path))
+    return f"data:image/jpeg;base64,{base64_image}"
+
+def analyze_image_with_gpt(image_url):
+    """gpt-4o-mini를 사용해서 이미지를 분석하는 함수 (http(s) URL 또는 data URL)"""
+    try:
+        return _request_image_analysis(image_url)
     except Exception as e:
         print(f"이미지 분석 중 오류 발생: {e}")
         return f"이미지 분석 실패: {str(e)}"
 
+def _request_image_analysis(image_url):
+    """이미지 분석 요청 (실패 시 예외를 그대로 전달)"""
+    response = openai_client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            # 고정 지시문은 system 메시지로 앞에 두어 OpenAI 프롬프트 캐싱(동일 접두부) 대상이 되게 함
+            {"role": "system", "content": VISION_PROMPT},
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": image_url
+                        }
+                    }
+                ]
+            }
+        ],
+        max_completion_tokens=VISION_MAX_TOKENS,
+        # 같은 캐시 키로 묶어 캐시 적중률 향상 (SDK 버전과 무관하게 전달)
+        extra_body={"prompt_cache_key": VISION_PROMPT_CACHE_KEY},
+    )
+
+    # GPT 응답에서 텍스트 추출
+    description = response.choices[0].message.content
+    print(f"이미지 분석 완료: {len(description)}자의 설명 생성됨")
+    return description
+
 def delete_temporary_file(file_path):
     """임시 파일을 삭제하는 함수"""
     try:
@@ -193,6 +510,29 @@ def delete_temporary_file(file_path):
     except Exception as e:
         print(f"파일 삭제 중 오류 발생: {e}")
 
+def _analyze_image_url(image_url, block_id):
+    """이미지 URL을 분석해 설명 반환 (다운로드 실패 시 None, 분석 실패는 예외)"""
+    # URL을 그대로 전달 (다운로드/base64 인코딩 없이 OpenAI가 직접 가져감)
+    try:
+        return _request_image_analysis(image_url)
+    except BadRequestError as e:
+        # 만료된 Notion 서명 URL 등 OpenAI가 가져오지 못한 경우에만 다운로드 후 data URL로 재시도
+        print(f"이미지 URL 직접 분석 실패, 다운로드 후 재시도: {e}")
+
+    temp_file_path, digest = download_image_temporarily(image_url, block_id)
+    if not temp_file_path:
+        return None
+    try:
+        # 내용이 같은 이미지를 이미 분석했다면 OpenAI 호출 생략
+        hash_key = f"hash:{digest}"
+        description = _image_desc_get(hash_key)
+        if description is None:
+            description = _request_image_analysis(image_file_to_data_url(temp_file_path))
+            _image_desc_set(hash_key, description)
+        return description
+    finally:
+        delete_temporary_file(temp_file_path)
+
 def process_image_block(block: dict) -> str:
     """이미지 블록을 전처리하는 함수"""
     try:
@@ -207,15 +547,22 @@ def process_image_block(block: dict) -> str:
             image_url = image_data.get("file", {}).get("url")
         if not image_url:
             return "이미지 URL을 찾을 수 없습니다."
-        
-        temp_file_path = download_image_temporarily(image_url, block_id)
-        if not temp_file_path:
-            return "이미지 다운로드 실패"
-        
-        description = analyze_image_with_gpt(temp_file_path)
 
-        delete_temporary_file(temp_file_path)
+        # Notion 파일 URL은 조회마다 서명이 바뀌므로 블록 ID + 수정 시각으로 캐시
+        cache_key = f"image:{block_id}:{block.get('last_edited_time', '')}"
+        cached = _disk_cache_get(cache_key)
+        if cached is not None:
+            return cached
         
+        url_key = _image_url_key(image_url)
+        with _image_key_lock(url_key):
+            description = _image_desc_get(url_key)
+            if description is None:
+                description = _analyze_image_url(image_url, block_id)
+                if description is None:
+                    return "이미지 다운로드 실패"
+                _image_desc_set(url_key, description)
+        _disk_cache_set(cache_key, description)
         return description
 
     except Exception as e:
@@ -223,51 +570,18 @@ def process_image_block(block: dict) -> str:
 
 #-------------------------------------------------------------------------------------------------------------------#
 
-def process_table_block_enhanced(block: dict) -> str:
+async def process_table_block_enhanced(block: dict) -> str:
     """표 블록을 마크다운 형식으로 전처리하는 함수"""
     try:
         table_block_id = block["id"]
-        all_rows_data = []
-        
-        # 표 블록의 자식인 'table_row' 블록들을 가져옵니다. - pagination 처리
-        table_rows = []
-        start_cursor = None
-        
-        while True:
-            response = notion.blocks.children.list(
-                block_id=table_block_id,
-                start_cursor=start_cursor
-            )
-            table_rows.extend(response.get("results", []))
-            if response.get("has_more"):
-                start_cursor = response.get("next_cursor")
-            else:
-                break
         
-        # 각 행(table_row)을 순회하며 셀 데이터를 추출합니다
-        for row in table_rows:
-            row_cells = row["table_row"]["cells"]
-            row_data = []
-            
-            # 각 셀의 텍스트를 추출합니다.
-            for cell in row_cells:
-                cell_text = "".join([part["plain_text"] for part in cell])
-                row_data.append(cell_text)
-            
-            all_rows_data.append(row_data)
-        
-        if not all_rows_data:
+        # 표 블록의 자식인 'table_row' 블록들을 가져옵니다. (pagination 처리된 목록)
+        table_rows = await _list_block_children(table_block_id, block.get("last_edited_time"))
+        if not table_rows:
             return "빈 표입니다."
         
-        # 마크다운 형식으로 변환
-        markdown_table = ""
-        for i, row_content in enumerate(all_rows_data):
-            # 셀 내용을 | 로 구분
-            markdown_table += "| " + " | ".join(row_content) + " |\n"
-            
-            # 첫 번째 행 다음에 헤더 구분선 추가
-            if i == 0:
-                markdown_table += "|" + "|".join([" --- " for _ in row_content]) + "|\n"
+        markdown_table = render_table_markdown(table_rows)
+        columns_count = len(table_rows[0]["table_row"]["cells"])
         
         # 전처리된 표 데이터 저장
         processed_tables.append({
@@ -277,8 +591,8 @@ def process_table_block_enhanced(block: dict) -> str:
             "metadata": {
                 "block_id": table_block_id,
                 "content_type": "table_markdown",
-                "rows_count": len(all_rows_data),
-                "columns_count": len(all_rows_data[0]) if all_rows_data else 0
+                "rows_count": len(table_rows),
+                "columns_count": columns_count
             }
         })
         
@@ -289,91 +603,27 @@ def process_table_block_enhanced(block: dict) -> str:
 
 #-------------------------------------------------------------------------------------------------------------------#
 
-def get_property_value(prop):
-    """
-    속성(property) 객체에서 실제 값을 추출합니다.
-    """
-    prop_type = prop.get('type')
-
-    if prop_type == 'title':
-        return prop['title'][0]['plain_text'] if prop['title'] else None
-    if prop_type == 'rich_text':
-        return prop['rich_text'][0]['plain_text'] if prop['rich_text'] else None
-    if prop_type == 'number':
-        return prop['number']
-    if prop_type == 'select':
-        return prop['select']['name'] if prop['select'] else None
-    if prop_type == 'status':
-        return prop['status']['name'] if prop['status'] else None
-    if prop_type == 'multi_select':
-        return [s['name'] for s in prop['multi_select']]
-    if prop_type == 'date':
-        date_info = prop['date']
-        if date_info:
-            return f"{date_info['start']} ~ {date_info['end']}" if date_info['end'] else date_info['start']
-        return None
-    if prop_type == 'formula':
-        return prop['formula'][prop['formula']['type']]
-    if prop_type == 'relation':
-        return [r['id'] for r in prop['relation']]
-    if prop_type == 'rollup':
-        # 롤업 타입에 따라 데이터 구조가 다를 수 있습니다.
-        rollup_type = prop['rollup']['type']
-        return prop['rollup'][rollup_type]
-    if prop_type == 'people':
-        return [p['name'] for p in prop['people']]
-    if prop_type == 'files':
-        return [f['name'] for f in prop['files']]
-    if prop_type == 'checkbox':
-        return prop['checkbox']
-    if prop_type == 'url':
-        return prop['url']
-    if prop_type == 'email':
-        return prop['email']
-    if prop_type == 'phone_number':
-        return prop['phone_number']
-    if prop_type == 'created_time':
-        return prop['created_time']
-    if prop_type == 'created_by':
-        return prop['created_by']['name']
-    if prop_type == 'last_edited_time':
-        return prop['last_edited_time']
-    if prop_type == 'last_edited_by':
-        return prop['last_edited_by']['name']
-    if prop_type == 'unique_id':
-        prefix = prop['unique_id'].get('prefix') or ""
-        number = prop['unique_id']['number']
-        return f"{prefix}-{number}"
-    
-    # Button과 같은 값 없는 타입은 처리하지 않음
-    return "Unsupported property type"
-
-def process_database_block_enhanced(block: dict) -> str:
+async def process_database_block_enhanced(block: dict) -> str:
     """데이터베이스 블록을 전처리하는 함수"""
     try:
         child_db_id = block["id"]
         database_title = block['child_database']['title']
 
-        # 데이터베이스의 모든 페이지 가져오기 - pagination 처리
-        pages = []
-        start_cursor = None
-        
-        while True:
-            response = notion.databases.query(
-                database_id=child_db_id,
-                start_cursor=start_cursor
-            )
-            pages.extend(response.get("results", []))
-            if response.get("has_more"):
-                start_cursor = response.get("next_cursor")
-            else:
-                break
+        # 데이터베이스의 모든 페이지 가져오기
+        pages = await _query_database(child_db_id)
+
+        result_parts = [f"[데이터베이스: {database_title}]\n"]
 
-        result = f"[데이터베이스: {database_title}]\n"
+        # 페이지 본문은 동시에 가져오고, 출력은 페이지 순서대로 조립
+        page_contents = await asyncio.gather(
+            *[
+                process_all_content_recursively(page['id'], depth=1, last_edited_time=page.get('last_edited_time'))
+                for page in pages
+            ]
+        )
 
         # 각 페이지를 순회하며 정보 출력
-        for page in pages:
-            page_id = page['id']
+        for page, page_content in zip(pages, page_contents):
             properties = page.get('properties', {})
             
             # 페이지 타이틀 추출
@@ -383,120 +633,149 @@ def process_database_block_enhanced(block: dict) -> str:
                     page_title = get_property_value(prop_data) or "제목 없음"
                     break
             
-            result += f"\n=== 페이지: {page_title} ===\n"
+            result_parts.append(f"\n=== 페이지: {page_title} ===\n")
             
             # 페이지 속성 정보 추가
-            result += f"\n--- 페이지 속성 ---\n"
+            result_parts.append("\n--- 페이지 속성 ---\n")
             for prop_name, prop_data in properties.items():
                 value = get_property_value(prop_data)
-                result += f"- {prop_name} ({prop_data['type']}): {value}\n"
+                result_parts.append(f"- {prop_name} ({prop_data['type']}): {value}\n")
             
-            # 페이지 본문 내용을 재귀적으로 가져오기
-            result += f"\n--- 페이지 본문 ---\n"
-            page_content = process_all_content_recursively(page_id, depth=1)
-            result += page_content + "\n"
+            # 페이지 본문 내용 (재귀적으로 가져온 결과)
+            result_parts.append("\n--- 페이지 본문 ---\n")
+            result_parts.append(page_content)
+            result_parts.append("\n")
 
-        return result
+        return "".join(result_parts)
 
     except Exception as e:
         return f"데이터베이스 처리 중 오류 발생: {str(e)}"
 #-------------------------------------------------------------------------------------------------------------------#
 
-def get_text_from_block(block: dict) -> str:
-    """다양한 블록 타입에서 텍스트를 추출하는 함수"""
-    block_type = block["type"]
-    
-    # 블록 타입에 따라 텍스트가 담긴 위치가 다름
-    if block_type in ["paragraph", "heading_1", "heading_2", "heading_3", 
-                      "bulleted_list_item", "numbered_list_item", "quote", "callout", "code", "toggle", "breadcrumb"]:
-        # 대부분의 텍스트는 해당 타입 이름의 키 값 안에 'rich_text' 배열로 존재
-        text_parts = block[block_type].get("rich_text", [])
-        
-    elif block_type == "to_do":
-        text_parts = block["to_do"].get("rich_text", [])
-        checked = block["to_do"]["checked"]
-        return f"[{'x' if checked else ' '}] {''.join([part['plain_text'] for part in text_parts])}"
-        
-    elif block_type == "child_page":
-        return f"{block['child_page']['title']} (하위 페이지)"
-
-    elif block_type == "child_database":
-        return process_database_block_enhanced(block)
-
-    elif block_type == "bookmark":
-        return f"{block['bookmark']['url']} (북마크)"
-    
-    elif block_type == "table":
-        return process_table_block_enhanced(block)
-    
-    elif block_type == "file":
-        return f"{block['file']['name']} (파일)"
-    
-    elif block_type == "image":
-        return process_image_block(block)
+async def _handle_image(block: dict) -> str:
+    # 다운로드/GPT 분석은 동기 I/O이므로 전용 스레드 풀에서 실행
+    # (탐색 중 발견된 이미지들이 블록 조회와 겹쳐서 최대 NOTION_IMAGE_WORKERS개씩 동시에 분석됨)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_image_executor, process_image_block, block)
 
-    else:
-        # 지원하지 않는 블록 타입은 건너뜀
-        return ""
-        
-    # rich_text 배열의 모든 텍스트 조각을 하나로 합침
-    return "".join([part["plain_text"] for part in text_parts])
+
+# 블록 타입 → 추가 API 호출/분석이 필요한 비동기 추출 함수
+_ASYNC_BLOCK_HANDLERS = {
+    "child_database": process_database_block_enhanced,
+    "table": process_table_block_enhanced,
+    "image": _handle_image,
+}
+
+
+async def get_text_from_block(block: dict) -> str:
+    """다양한 블록 타입에서 텍스트를 추출하는 함수 (지원하지 않는 블록 타입은 빈 문자열)"""
+    text = render_block(block)
+    if text is not None:
+        return text
+    async_handler = _ASYNC_BLOCK_HANDLERS.get(block["type"])
+    if async_handler is not None:
+        return await async_handler(block)
+    return ""
 
 #-------------------------------------------------------------------------------------------------------------------#
 
-def process_all_content_recursively(parent_id: str, depth: int = 0):
+async def _expand_node(parent_id: str, last_edited_time: str | None):
+    """노드의 자식 블록 목록과 각 블록의 텍스트를 함께 가져옴"""
+    blocks = await _list_block_children(parent_id, last_edited_time)
+    texts = await asyncio.gather(*[get_text_from_block(block) for block in blocks])
+    return blocks, texts
+
+
+async def aiter_content(parent_id: str, depth: int = 0, last_edited_time: str | None = None):
     """
-    페이지와 블록의 모든 계층 구조를 재귀적으로 탐색하는 통합 함수
+    페이지와 블록의 모든 계층 구조를 탐색하며 출력 텍스트 조각을 원래 블록 순서대로 yield
     - parent_id: 페이지 또는 블록의 ID
-    - depth: 현재 탐색 깊이 (들여쓰기용)
+    - depth: 시작 탐색 깊이 (들여쓰기용)
+    - last_edited_time: parent의 수정 시각 (디스크 캐시 키, 없으면 디스크 캐시 미사용)
+    재귀 대신 deque로 레벨 단위 BFS를 돌며 한 레벨의 모든 노드(자식이 있는 블록)를 asyncio.gather로 동시에 조회하고,
+    레벨이 끝날 때마다 순서가 확정된 앞부분을 바로 내보냅니다. (동시 요청 수는 NOTION_CONC로 제한)
     """
-    indent = "  " * depth
-    all_text = ""
-    
-    try:
-        # parent_id에 속한 자식 블록들을 가져옴 (페이지 또는 블록) - pagination 처리
-        blocks = []
-        start_cursor = None
-        
-        while True:
-            response = notion.blocks.children.list(
-                block_id=parent_id,
-                start_cursor=start_cursor
-            )
-            blocks.extend(response.get("results", []))
-            if response.get("has_more"):
-                start_cursor = response.get("next_cursor")
-            else:
+    # 노드 = (블록/페이지 ID, 깊이, 수정 시각)
+    # 노드별 출력 조각 = 텍스트(str) 또는 하위 노드 번호(int) 목록, 아직 조회 전이면 None
+    nodes: list[tuple[str, int, str | None]] = [(parent_id, depth, last_edited_time)]
+    node_parts: list[list | None] = [None]
+    level: deque[int] = deque([0])
+    # 출력 순회 위치: [노드 번호, 다음에 내보낼 조각 위치] 스택 (깊이 우선)
+    stack: list[list[int]] = [[0, 0]]
+
+    while level:
+        current = list(level)
+        level.clear()
+        results = await asyncio.gather(
+            *[_expand_node(nodes[i][0], nodes[i][2]) for i in current],
+            return_exceptions=True,
+        )
+        for node_idx, result in zip(current, results):
+            node_id, node_depth, _ = nodes[node_idx]
+            indent = "  " * node_depth
+            parts = []
+            node_parts[node_idx] = parts
+            if isinstance(result, Exception):
+                parts.append(f"{indent}🔥 ID({node_id}) 처리 중 오류 발생: {result}\n")
+                continue
+            if isinstance(result, BaseException):
+                raise result
+
+            blocks, block_texts = result
+            for block, block_text in zip(blocks, block_texts):
+                if block_text:
+                    parts.append(f"{indent}- {block_text}\n")
+                # '하위 페이지'이거나 다른 자식 블록(들여쓰기)을 가진 블록은 다음 레벨에서 탐색
+                if block["type"] == "child_page" or block["has_children"]:
+                    child_idx = len(nodes)
+                    nodes.append((block["id"], node_depth + 1, block.get("last_edited_time")))
+                    node_parts.append(None)
+                    parts.append(child_idx)
+                    level.append(child_idx)
+
+        # 아직 조회하지 않은 하위 노드를 만날 때까지 확정된 조각을 내보냄
+        while stack:
+            frame = stack[-1]
+            parts = node_parts[frame[0]]
+            if parts is None:
                 break
+            if frame[1] == len(parts):
+                stack.pop()
+                continue
+            item = parts[frame[1]]
+            frame[1] += 1
+            if isinstance(item, int):
+                stack.append([item, 0])
+            else:
+                yield item
 
-        for block in blocks:
-            # 1. 현재 블록의 내용을 먼저 가져옴
-            block_text = get_text_from_block(block)
-            if block_text:
-                all_text += f"{indent}- {block_text}\n"
 
-            # 2. 이 블록이 '하위 페이지'인지 확인하고 재귀 호출
-            if block["type"] == "child_page":
-                all_text += process_all_content_recursively(block["id"], depth + 1)
-            
-            # 3. '하위 페이지'가 아니면서 다른 자식 블록(들여쓰기)을 가졌는지 확인하고 재귀 호출
-            elif block["has_children"]:
-                all_text += process_all_content_recursively(block["id"], depth + 1)
+async def process_all_content_recursively(parent_id: str, depth: int = 0, last_edited_time: str | None = None):
+    """페이지와 블록의 모든 계층 구조를 탐색해 하나의 문자열로 반환 (aiter_content 참고)"""
+    return "".join([chunk async for chunk in aiter_content(parent_id, depth, last_edited_time)])
+
+async def get_page_title(page_id: str) -> str:
+    """페이지 제목 조회 (_block_cache에 ("title", page_id) 키로 메모이제이션)"""
+    async def _fetch():
+        client, _ = _get_async_notion()
+        page_info = await _call_notion(client.pages.retrieve, page_id=page_id)
+        title_parts = page_info["properties"]["title"]["title"]
+        return title_parts[0]["plain_text"] if title_parts else "(제목 없음)"
+
+    return await _memoized(_block_cache, "blocks", ("title", page_id), _fetch)
+
+
+async def crawl_start_page(page_id: str) -> str:
+    """시작 페이지 제목과 첫 자식 블록을 동시에 조회한 뒤 전체 탐색 (자식 목록은 캐시되어 재사용)"""
+    start_page_title, _ = await asyncio.gather(get_page_title(page_id), _list_block_children(page_id))
+    print(f"탐색 시작: {start_page_title} (ID: {page_id})\n" + "="*40)
+    return await process_all_content_recursively(page_id)
 
-    except Exception as e:
-        all_text += f"{indent}🔥 ID({parent_id}) 처리 중 오류 발생: {e}\n"
-        
-    return all_text
 
 # --- 스크립트 실행 ---
 if __name__ == "__main__":
     try:
-        start_page_info = notion.pages.retrieve(page_id=START_PAGE_ID)
-        start_page_title_parts = start_page_info["properties"]["title"]["title"]
-        start_page_title = start_page_title_parts[0]["plain_text"] if start_page_title_parts else "(제목 없음)"
-
-        print(f"탐색 시작: {start_page_title} (ID: {START_PAGE_ID})\n" + "="*40)
-        result = process_all_content_recursively(START_PAGE_ID)
+        result = asyncio.run(crawl_start_page(START_PAGE_ID))
         # print(result)
         print("="*40 + "\n탐색 완료.")
 
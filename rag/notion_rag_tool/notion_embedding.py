@@ -1,11 +1,14 @@
 import os
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from notion_client import Client
 from get_text_from_notion import process_all_content_recursively
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
 import chromadb
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 
 # .env 파일에서 환경 변수 로드
 load_dotenv()
@@ -31,21 +34,49 @@ notion = Client(auth=NOTION_TOKEN)
 
 # Notion 페이지에서 텍스트 추출
 print("Notion 페이지에서 텍스트를 추출합니다...")
-text_content = process_all_content_recursively(START_PAGE_ID)
+text_content = asyncio.run(process_all_content_recursively(START_PAGE_ID))
 print("텍스트 추출 완료.")
 
 # 텍스트를 청크로 분할
 print("텍스트를 청크로 분할합니다...")
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1024,
-    chunk_overlap=128,
+# 글자 수 대신 임베딩 모델과 같은 토크나이저(cl100k_base)의 토큰 수로 분할
+# (한국어는 글자당 토큰 수가 많아 글자 기준이면 청크 토큰 수가 들쭉날쭉해짐)
+text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+    encoding_name="cl100k_base",
+    chunk_size=800,
+    chunk_overlap=100,
 )
 texts = text_splitter.split_text(text_content)
 print(f"{len(texts)}개의 청크로 분할되었습니다.")
 
-# 임베딩 모델 초기화
+# 동일한 청크(머리글/반복 문구 등)는 한 번만 임베딩 - 내용 해시를 ID로 사용해 재실행 시에도 중복 저장 방지
+unique = {}
+for text in texts:
+    unique.setdefault(hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(), text)
+ids = list(unique)
+texts = list(unique.values())
+print(f"중복 제거 후 {len(texts)}개의 청크를 임베딩합니다.")
+
+# 임베딩 모델 초기화 (요청당 최대 1024개 입력으로 HTTP 왕복 최소화)
+# 청크가 이미 800토큰 이하로 잘려 있어 컨텍스트 길이 확인용 재토큰화는 생략
 print("임베딩을 생성하고 ChromaDB에 저장합니다...")
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+embeddings = OpenAIEmbeddings(
+    model="text-embedding-3-small",
+    chunk_size=1024,
+    max_retries=6,
+    request_timeout=60,
+    check_embedding_ctx_length=False,
+)
+vectors = embeddings.embed_documents(texts)
+
+# Chroma 저장 시 한 번에 보내는 레코드 수 / 동시에 보내는 요청 수
+ADD_BATCH_SIZE = int(os.getenv("CHROMA_ADD_BATCH_SIZE", "500"))
+ADD_WORKERS = int(os.getenv("CHROMA_ADD_WORKERS", "4"))
+
+
+def _is_rate_limited(exc: BaseException) -> bool:
+    # Chroma Cloud는 동시 요청이 몰리면 429를 돌려줌 - 그 경우에만 재시도
+    return getattr(exc, "code", None) == 429 or type(exc).__name__ in ("RateLimitError", "QuotaError")
 
 #-------------------Chroma Cloud 사용---------------#
 # ChromaDB 컬렉션 이름 설정
@@ -59,25 +90,40 @@ client = chromadb.CloudClient(
 )
 
 
-# ChromaDB에 데이터 저장
-vectorstore = Chroma.from_texts(
-    texts=texts,
-    embedding=embeddings,
-    collection_name=collection_name,
-    client=client
-)
 #--------------------------------------------------#
 
 #-------------------로컬 ChromaDB 사용---------------#
 # persist_directory = "./chroma_db"
 # collection_name = "notion-collection"
-
-# vectorstore = Chroma.from_texts(
-#     texts=texts,
-#     embedding=embeddings,
-#     collection_name=collection_name,
-#     persist_directory=persist_directory
-# )
+# client = chromadb.PersistentClient(path=persist_directory)
 #--------------------------------------------------#
 
+# ChromaDB에 데이터 저장 (미리 계산한 임베딩을 직접 전달)
+collection = client.get_or_create_collection(name=collection_name)
+
+
+@retry(
+    retry=retry_if_exception(_is_rate_limited),
+    wait=wait_random_exponential(min=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+def _upsert_batch(start: int) -> int:
+    end = start + ADD_BATCH_SIZE
+    collection.upsert(
+        ids=ids[start:end],
+        embeddings=vectors[start:end],
+        documents=texts[start:end],
+    )
+    return len(ids[start:end])
+
+
+# 배치를 여러 HTTP 연결로 나눠 동시에 업로드 (한 연결에 순차 전송하지 않음)
+starts = range(0, len(texts), ADD_BATCH_SIZE)
+saved = 0
+with ThreadPoolExecutor(max_workers=max(1, min(ADD_WORKERS, len(starts)))) as executor:
+    for count in executor.map(_upsert_batch, starts):
+        saved += count
+        print(f"  저장 진행: {saved}/{len(texts)}")
+
 print("임베딩 및 저장이 완료되었습니다.")
\ No newline at end of file
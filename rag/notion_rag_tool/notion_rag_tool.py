@@ -17,6 +17,8 @@ Agent Core 연결 방법:
 """
 
 import os
+import threading
+from cachetools.func import ttl_cache
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from langchain_openai import OpenAIEmbeddings, ChatOpenAI
@@ -28,20 +30,30 @@ load_dotenv()
 
 NOTION_TOKEN = os.getenv("NOTION_TOKEN")
 START_PAGE_ID = '264120560ff680198c0fefbbe17bfc2c' # 시작 페이지 ID. 나중에 Frontend에서 받아올 것
+# 검색 결과 캐시 유효 시간(초) - notion_embedding.py로 재적재한 내용이 이 시간 안에 반영됨
+NOTION_RAG_CACHE_TTL = float(os.getenv("NOTION_RAG_CACHE_TTL", "300"))
 
 class NotionRAGService:
     """Notion RAG 서비스 클래스"""
     
     _instance = None
     _initialized = False
+    # 여러 스레드가 동시에 첫 호출을 해도 _setup은 한 번만 실행되도록 보호
+    _lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(NotionRAGService, cls).__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super(NotionRAGService, cls).__new__(cls)
         return cls._instance
     
     def __init__(self):
-        if not self._initialized:
+        if self._initialized:
+            return
+        with NotionRAGService._lock:
+            if NotionRAGService._initialized:
+                return
             self.collection_name = "notion-collection"
             self.embeddings = None
             self.vectorstore = None
@@ -84,7 +96,7 @@ class NotionRAGService:
     def search(self, query: str) -> str:
         """Notion 문서에서 질문에 대한 답변 검색"""
 
-        return self.retriever.invoke(query)
+        return list(_cached_retrieve(_normalize_query(query)))
         # if self.rag_chain is None:
         #     return "Notion RAG 시스템이 초기화되지 않았습니다. 환경 변수를 확인해주세요."
         
@@ -95,8 +107,25 @@ class NotionRAGService:
         #     return f"검색 중 오류가 발생했습니다: {str(e)}"
 
 
-# 전역 서비스 인스턴스
-_notion_rag_service = NotionRAGService()
+def _normalize_query(query: str) -> str:
+    """캐시 키용 질의 정규화 (앞뒤 공백 제거 + 연속 공백 축약)"""
+    return " ".join(query.split())
+
+
+@ttl_cache(maxsize=512, ttl=NOTION_RAG_CACHE_TTL)
+def _cached_retrieve(query: str) -> tuple:
+    """정규화된 질의별 검색 결과 캐시 (에이전트 루프의 반복 검색 재사용)"""
+    return tuple(NotionRAGService().retriever.invoke(query))
+
+
+def clear_search_cache() -> None:
+    """검색 결과 캐시 비우기 (Notion 컬렉션을 다시 적재한 뒤 호출)"""
+    _cached_retrieve.cache_clear()
+
+
+def get_notion_rag_service() -> NotionRAGService:
+    """서비스 인스턴스 반환 (첫 호출 시점에 초기화)"""
+    return NotionRAGService()
 
 
 @tool
@@ -113,7 +142,7 @@ def notion_rag_search(query: str) -> str:
     Returns:
         str: Notion 문서를 기반으로 한 답변
     """
-    return _notion_rag_service.search(query)
+    return get_notion_rag_service().search(query)
 
 # # Agent Core에서 사용할 수 있도록 tools 리스트로 제공
 # tools = [notion_rag_search]
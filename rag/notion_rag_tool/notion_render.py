@@ -0,0 +1,144 @@
+"""
+Notion 블록/속성 → 텍스트 변환 (순수 함수 모음)
+
+API 호출이나 파일 I/O 없이 이미 받아온 블록/속성 dict만 읽어서 문자열을 만든다.
+크롤링 후 남는 CPU 부하(dict/list 순회)가 이 모듈에 모여 있어 mypyc로 따로 컴파일할 수 있다.
+
+    mypyc notion_render.py
+
+빌드된 확장 모듈(.so/.pyd)이 같은 디렉터리에 있으면 `import notion_render`가 그것을 우선 로드하고,
+없으면 이 파일이 그대로 사용된다. (호출 측 코드 변경 없음)
+"""
+
+from typing import Any, Callable, Optional
+
+# 텍스트가 해당 타입 이름의 키 값 안에 'rich_text' 배열로 존재하는 블록들
+RICH_TEXT_TYPES = frozenset({
+    "paragraph", "heading_1", "heading_2", "heading_3",
+    "bulleted_list_item", "numbered_list_item", "quote", "callout", "code", "toggle", "breadcrumb",
+})
+
+
+def rich_text_join(parts: list) -> str:
+    # rich_text 배열의 모든 텍스트 조각을 하나로 합침
+    return "".join([part["plain_text"] for part in parts])
+
+
+def _render_rich_text(block: dict) -> str:
+    return rich_text_join(block[block["type"]].get("rich_text", []))
+
+
+def _render_todo(block: dict) -> str:
+    to_do: dict = block["to_do"]
+    text = rich_text_join(to_do.get("rich_text", []))
+    return f"[{'x' if to_do['checked'] else ' '}] {text}"
+
+
+def _render_child_page(block: dict) -> str:
+    return f"{block['child_page']['title']} (하위 페이지)"
+
+
+def _render_bookmark(block: dict) -> str:
+    return f"{block['bookmark']['url']} (북마크)"
+
+
+def _render_file(block: dict) -> str:
+    return f"{block['file']['name']} (파일)"
+
+
+# 블록 타입 → 텍스트 추출 함수 (API 호출 없이 블록 자체에서 바로 추출)
+BLOCK_RENDERERS: dict[str, Callable[[dict], str]] = {t: _render_rich_text for t in RICH_TEXT_TYPES}
+BLOCK_RENDERERS.update({
+    "to_do": _render_todo,
+    "child_page": _render_child_page,
+    "bookmark": _render_bookmark,
+    "file": _render_file,
+})
+
+
+def render_block(block: dict) -> Optional[str]:
+    """블록 자체만으로 텍스트를 만들 수 있으면 그 텍스트를, 아니면 None을 반환"""
+    renderer = BLOCK_RENDERERS.get(block["type"])
+    if renderer is None:
+        return None
+    return renderer(block)
+
+
+def render_table_markdown(table_rows: list) -> str:
+    """'table_row' 블록 목록을 마크다운 표 문자열로 변환 (첫 행을 헤더로 사용)"""
+    # 각 행(table_row)의 셀 텍스트를 바로 마크다운 행으로 변환 (셀 내용을 | 로 구분)
+    lines: list[str] = [
+        "| " + " | ".join([rich_text_join(cell) for cell in row["table_row"]["cells"]]) + " |"
+        for row in table_rows
+    ]
+    columns_count = len(table_rows[0]["table_row"]["cells"])
+    # 첫 번째 행 다음에 헤더 구분선 추가
+    lines.insert(1, "|" + "|".join([" --- "] * columns_count) + "|")
+    return "\n".join(lines) + "\n"
+
+#-------------------------------------------------------------------------------------------------------------------#
+
+def _first_plain_text(value: list) -> Optional[str]:
+    return value[0]['plain_text'] if value else None
+
+
+def _name_or_none(value: Optional[dict]) -> Optional[str]:
+    return value['name'] if value else None
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _typed_value(value: dict) -> Any:
+    # formula/rollup: 내부 'type' 키가 실제 값의 키를 가리킴 (롤업 타입에 따라 데이터 구조가 다를 수 있습니다.)
+    return value[value['type']]
+
+
+def _date_value(date_info: Optional[dict]) -> Optional[str]:
+    if date_info:
+        return f"{date_info['start']} ~ {date_info['end']}" if date_info['end'] else date_info['start']
+    return None
+
+
+def _unique_id_value(unique_id: dict) -> str:
+    prefix = unique_id.get('prefix') or ""
+    return f"{prefix}-{unique_id['number']}"
+
+
+# 속성 타입 → 값 추출 함수 (인자는 prop[타입] 값)
+PROP_HANDLERS: dict[str, Callable[[Any], Any]] = {
+    'title': _first_plain_text,
+    'rich_text': _first_plain_text,
+    'number': _identity,
+    'select': _name_or_none,
+    'status': _name_or_none,
+    'multi_select': lambda v: [s['name'] for s in v],
+    'date': _date_value,
+    'formula': _typed_value,
+    'relation': lambda v: [r['id'] for r in v],
+    'rollup': _typed_value,
+    'people': lambda v: [p['name'] for p in v],
+    'files': lambda v: [f['name'] for f in v],
+    'checkbox': _identity,
+    'url': _identity,
+    'email': _identity,
+    'phone_number': _identity,
+    'created_time': _identity,
+    'created_by': lambda v: v['name'],
+    'last_edited_time': _identity,
+    'last_edited_by': lambda v: v['name'],
+    'unique_id': _unique_id_value,
+}
+
+
+def get_property_value(prop: dict) -> Any:
+    """
+    속성(property) 객체에서 실제 값을 추출합니다.
+    """
+    prop_type = prop.get('type')
+    handler = PROP_HANDLERS.get(prop_type) if prop_type is not None else None
+    if handler is None:
+        # Button과 같은 값 없는 타입은 처리하지 않음
+        return "Unsupported property type"
+    return handler(prop[prop_type])
@@ -3,6 +3,15 @@ Retriever - 검색 및 RAG 로직
 """
 
 from typing import Dict, Any, List, Optional
+import heapq
+
+import numpy as np
+
+try:
+    import simsimd  # SIMD 코사인 커널 (선택)
+except ImportError:
+    simsimd = None
+
 from .vector_store import VectorStore, EmbeddingModel
 
 
@@ -23,10 +32,10 @@ class DocumentRetriever:
         # 문서를 청크로 분할
         chunks = self._split_document(content)
 
-        # 각 청크에 대해 임베딩 생성 및 저장
+        # 모든 청크를 한 번에 임베딩한 뒤 저장
+        embeddings = await self.embedding_model.embed_texts(chunks)
         documents = []
-        for i, chunk in enumerate(chunks):
-            embedding = await self.embedding_model.embed_text(chunk)
+        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
             doc = {
                 "id": f"{collection_name}_{len(documents)}_{i}",
                 "content": chunk,
@@ -45,16 +54,18 @@ class DocumentRetriever:
         # 쿼리 임베딩 생성
         query_embedding = await self.embedding_model.embed_text(query)
 
-        # 벡터 검색 수행
-        results = await self.vector_store.search(collection_name, query, top_k)
+        # 벡터 검색 수행 (벡터 스토어가 점수를 계산해 점수순으로 반환)
+        results = await self.vector_store.search(
+            collection_name, query, top_k, query_embedding=query_embedding
+        )
 
-        # 유사도 계산 및 정렬 (실제로는 벡터 DB에서 처리)
         scored_results = []
         for doc in results:
-            # 임시 점수 계산 (실제로는 코사인 유사도 등 사용)
-            score = self._calculate_similarity(
-                query_embedding, doc.get("embedding", [])
-            )
+            score = doc.get("score")
+            if score is None:
+                score = self._calculate_similarity(
+                    query_embedding, doc.get("embedding", [])
+                )
             scored_results.append(
                 {
                     "content": doc["content"],
@@ -63,38 +74,40 @@ class DocumentRetriever:
                 }
             )
 
-        # 점수순 정렬
-        scored_results.sort(key=lambda x: x["score"], reverse=True)
-        return scored_results[:top_k]
+        # 상위 top_k만 힙으로 선택 (전체 정렬 없이 O(N log k))
+        return heapq.nlargest(top_k, scored_results, key=lambda x: x["score"])
 
     def _split_document(
         self, content: str, chunk_size: int = 1000, chunk_overlap: int = 200
     ) -> List[str]:
-        """문서를 청크로 분할"""
-        chunks = []
-        start = 0
-        content_length = len(content)
-
-        while start < content_length:
-            end = min(start + chunk_size, content_length)
-            chunk = content[start:end]
-            chunks.append(chunk)
-            start = end - chunk_overlap
-
-            if start >= content_length:
-                break
-
-        return chunks
+        """문서를 청크로 분할 (chunk_size - chunk_overlap 간격으로 고정 길이 슬라이스)"""
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap은 chunk_size보다 작아야 합니다.")
+        if not content:
+            return []
+
+        # 마지막 청크가 문서 끝에 닿으면 멈춤 (끝에 겹침만 남은 조각은 만들지 않음)
+        step = chunk_size - chunk_overlap
+        return [
+            content[i : i + chunk_size]
+            for i in range(0, max(1, len(content) - chunk_overlap), step)
+        ]
 
     def _calculate_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """벡터 유사도 계산 (코사인 유사도)"""
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
+        if vec1 is None or vec2 is None or len(vec1) == 0 or len(vec1) != len(vec2):
             return 0.0
 
-        # 임시 유사도 계산
-        import random
+        v1 = np.asarray(vec1, dtype=np.float32)
+        v2 = np.asarray(vec2, dtype=np.float32)
+        # SimSIMD가 있으면 AVX-512/NEON 커널 사용 (cosine은 거리이므로 1에서 뺌)
+        if simsimd is not None:
+            return float(1.0 - simsimd.cosine(v1, v2))
 
-        return random.uniform(0.5, 1.0)
+        denom = float(np.linalg.norm(v1) * np.linalg.norm(v2))
+        if denom == 0.0:
+            return 0.0
+        return float(np.dot(v1, v2) / denom)
 
 
 class RAGGenerator:
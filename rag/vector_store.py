@@ -2,70 +2,315 @@
 Vector Store - 벡터 데이터베이스 관리
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional
+import asyncio
+import math
 import os
 import json
 
+import numpy as np
+
+
+# HNSW 파라미터 (M: 노드당 이웃 수, efConstruction/efSearch: 구축/검색 시 후보 폭)
+HNSW_M = int(os.getenv("VECTOR_HNSW_M", "32"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("VECTOR_HNSW_EF_CONSTRUCTION", "100"))
+HNSW_EF_SEARCH = int(os.getenv("VECTOR_HNSW_EF_SEARCH", "64"))
+
+# IVF-PQ: 학습(k-means)에 필요한 최소 벡터 수 - 그 전까지는 행렬 전수 검색
+IVFPQ_MIN_TRAIN = int(os.getenv("VECTOR_IVFPQ_MIN_TRAIN", "10000"))
+IVFPQ_NBITS = 8
+# int8 HNSW(SQ): 값 범위 학습에 필요한 최소 벡터 수 - 그 전까지는 행렬 전수 검색
+HNSW_SQ_MIN_TRAIN = int(os.getenv("VECTOR_HNSW_SQ_MIN_TRAIN", "1000"))
+# int8 전수 검색 시 한 번에 float32로 올리는 행 수 (임시 배열 크기 상한)
+INT8_SCAN_ROWS = int(os.getenv("VECTOR_INT8_SCAN_ROWS", "4096"))
+
+IndexType = Literal["flat", "hnsw", "ivfpq"]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """마지막 축 기준 L2 정규화 (영벡터는 0으로 유지)"""
+    return vectors / (np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12)
+
+
+def _quantize_int8(vectors: np.ndarray):
+    """행별 대칭 int8 양자화 → (codes int8 (N, D), scales float32 (N,))"""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales
+
+
+def _int8_dot(codes: np.ndarray, scales: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """int8 행렬과 float32 쿼리의 내적
+
+    쿼리는 float32 그대로 두어 반올림 오차를 한 번만 남기고, 행을 INT8_SCAN_ROWS개씩 나눠
+    float32로 올려 곱하므로 (N, D) float32 임시 배열을 만들지 않음 (읽는 바이트는 int8 그대로)
+    """
+    scores = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), INT8_SCAN_ROWS):
+        rows = codes[start : start + INT8_SCAN_ROWS]
+        scores[start : start + len(rows)] = rows.astype(np.float32) @ q
+    return scores * scales
+
 
 class VectorStore:
-    """벡터 스토어 클래스"""
+    """벡터 스토어 클래스 (faiss가 있으면 HNSW/IVF-PQ 인덱스, 없으면 행렬 전수 검색)"""
 
     def __init__(self, db_path: str = "./vector_db"):
         self.db_path = db_path
         self.collections = {}
+        self._faiss = None
 
     async def initialize(self):
         """벡터 스토어 초기화"""
         try:
             os.makedirs(self.db_path, exist_ok=True)
+            try:
+                import faiss
+
+                self._faiss = faiss
+            except ImportError:
+                print("faiss 미설치: 행렬 전수 검색으로 동작합니다.")
             print(f"벡터 스토어 초기화됨: {self.db_path}")
-            # TODO: 실제 벡터 DB (Chroma, Pinecone 등) 초기화
             return True
         except Exception as e:
             print(f"벡터 스토어 초기화 실패: {e}")
             return False
 
-    async def create_collection(self, name: str, metadata: Dict[str, Any] = None):
-        """컬렉션 생성"""
-        # TODO: 실제 컬렉션 생성 구현
-        self.collections[name] = {"metadata": metadata or {}, "documents": []}
-        print(f"컬렉션 생성됨: {name}")
+    async def create_collection(
+        self,
+        name: str,
+        metadata: Dict[str, Any] = None,
+        index_type: IndexType = "hnsw",
+        quantize: bool = False,
+    ):
+        """컬렉션 생성 (index_type: flat=전수 검색, hnsw, ivfpq=대용량용 압축 인덱스)
+
+        quantize=True면 임베딩을 int8 + 행별 scale로 저장해 메모리/대역폭을 1/4로 줄임
+        """
+        # 문서는 필드별 배열(SoA)로 보관: ids/contents/metadatas의 i번째 = matrix의 i번째 행
+        # matrix: L2 정규화한 임베딩을 담는 (capacity, D) 버퍼, 앞의 size개 행만 유효 (내적 = 코사인)
+        #         quantize=True면 int8 코드, scales에 행별 scale
+        # index: faiss 인덱스 (차원/학습 데이터가 갖춰지는 add_documents에서 생성)
+        self.collections[name] = {
+            "metadata": metadata or {},
+            "index_type": index_type,
+            "quantize": quantize,
+            "ids": [],
+            "contents": [],
+            "metadatas": [],
+            "size": 0,
+            "matrix": None,
+            "scales": None,
+            "index": None,
+        }
+        print(f"컬렉션 생성됨: {name} ({index_type})")
+
+    @staticmethod
+    def _rows(collection: Dict[str, Any], idx=slice(None)) -> np.ndarray:
+        """저장된 임베딩 행을 float32로 반환 (int8이면 역양자화)"""
+        size = collection["size"]
+        rows = collection["matrix"][:size][idx]
+        if collection["quantize"]:
+            return rows.astype(np.float32) * collection["scales"][:size][idx][:, None]
+        return rows
+
+    @staticmethod
+    def _append_rows(collection: Dict[str, Any], rows: np.ndarray, scales: Optional[np.ndarray]):
+        """버퍼 끝에 행 추가 (용량이 모자라면 2배로 늘려 추가를 분할 상환 O(1)로 유지)"""
+        size, n = collection["size"], len(rows)
+        matrix = collection["matrix"]
+        if matrix is None or size + n > len(matrix):
+            capacity = max(size + n, 2 * (0 if matrix is None else len(matrix)), 64)
+            grown = np.empty((capacity, rows.shape[1]), dtype=rows.dtype)
+            grown_scales = np.empty(capacity, dtype=np.float32) if scales is not None else None
+            if matrix is not None:
+                grown[:size] = matrix[:size]
+                if scales is not None:
+                    grown_scales[:size] = collection["scales"][:size]
+            collection["matrix"], collection["scales"] = grown, grown_scales
+        collection["matrix"][size : size + n] = rows
+        if scales is not None:
+            collection["scales"][size : size + n] = scales
+        collection["size"] = size + n
+
+    @staticmethod
+    def _document(collection: Dict[str, Any], i: int, score: Optional[float] = None) -> Dict[str, Any]:
+        """i번째 문서를 dict로 조립"""
+        doc = {
+            "id": collection["ids"][i],
+            "content": collection["contents"][i],
+            "metadata": collection["metadatas"][i],
+        }
+        if score is not None:
+            doc["score"] = score
+        return doc
+
+    def _new_index(self, index_type: IndexType, vectors: np.ndarray, quantize: bool = False):
+        """인덱스 생성 (IVF-PQ/SQ는 vectors로 학습, 학습 데이터가 부족하면 None)"""
+        n, dim = vectors.shape
+        if index_type == "hnsw" and quantize:
+            # 그래프 노드의 벡터도 8bit 스칼라 양자화로 저장
+            # (학습한 값 범위 밖은 잘리므로 충분한 표본이 쌓인 뒤에 학습)
+            if n < HNSW_SQ_MIN_TRAIN:
+                return None
+            index = self._faiss.IndexHNSWSQ(
+                dim, self._faiss.ScalarQuantizer.QT_8bit, HNSW_M, self._faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            return index
+        if index_type == "hnsw":
+            index = self._faiss.IndexHNSWFlat(dim, HNSW_M, self._faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = HNSW_EF_SEARCH
+            return index
+        if index_type == "ivfpq" and n >= IVFPQ_MIN_TRAIN:
+            nlist = max(1, int(2 * math.sqrt(n)))
+            # 서브벡터 수 m은 차원을 나눠떨어뜨려야 함 (D=384 → 48개 x 8차원)
+            m = next(m for m in (48, 32, 24, 16, 8, 4, 2, 1) if dim % m == 0)
+            quantizer = self._faiss.IndexFlatIP(dim)
+            index = self._faiss.IndexIVFPQ(
+                quantizer, dim, nlist, m, IVFPQ_NBITS, self._faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(vectors)
+            index.nprobe = max(1, min(nlist // 4, 10))
+            return index
+        return None
 
     async def add_documents(
         self, collection_name: str, documents: List[Dict[str, Any]]
     ):
         """문서 추가"""
-        # TODO: 실제 문서 임베딩 및 저장 구현
         if collection_name not in self.collections:
             await self.create_collection(collection_name)
 
-        self.collections[collection_name]["documents"].extend(documents)
+        collection = self.collections[collection_name]
+        if documents:
+            collection["ids"].extend(doc["id"] for doc in documents)
+            collection["contents"].extend(doc["content"] for doc in documents)
+            collection["metadatas"].extend(doc.get("metadata", {}) for doc in documents)
+
+            block = _normalize(
+                np.asarray([doc["embedding"] for doc in documents], dtype=np.float32)
+            )
+            stored, scales = _quantize_int8(block) if collection["quantize"] else (block, None)
+            self._append_rows(collection, stored, scales)
+
+            if self._faiss is not None and collection["index_type"] != "flat":
+                if collection["index"] is not None:
+                    collection["index"].add(block)
+                else:
+                    # 처음 생성될 때는 지금까지 쌓인 전체 행렬을 넣어 행 번호와 인덱스 ID를 맞춤
+                    vectors = self._rows(collection)
+                    index = self._new_index(
+                        collection["index_type"], vectors, collection["quantize"]
+                    )
+                    if index is not None:
+                        index.add(vectors)
+                        collection["index"] = index
         print(f"문서 {len(documents)}개가 {collection_name}에 추가됨")
 
     async def search(
-        self, collection_name: str, query: str, top_k: int = 5
+        self,
+        collection_name: str,
+        query: str,
+        top_k: int = 5,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
-        """벡터 검색"""
-        # TODO: 실제 벡터 검색 구현
+        """벡터 검색 (query_embedding이 있으면 코사인 유사도 상위 top_k, score 포함)"""
         if collection_name not in self.collections:
             return []
 
-        # 임시 검색 구현 (실제로는 임베딩 유사도 계산)
-        documents = self.collections[collection_name]["documents"]
-        return documents[:top_k]
+        collection = self.collections[collection_name]
+        size = collection["size"]
+        if query_embedding is None or size == 0 or top_k <= 0:
+            return [self._document(collection, i) for i in range(min(top_k, size))]
+
+        matrix = collection["matrix"][:size]
+        q = _normalize(np.asarray(query_embedding, dtype=np.float32))
+        k = min(top_k, size)
+
+        if collection["index"] is not None:
+            # 인덱스로 후보 k개를 찾은 뒤 그 k개만 정확한 내적으로 재채점 (PQ 근사 오차 보정)
+            _, ids = collection["index"].search(q[None, :], k)
+            idx = ids[0][ids[0] >= 0]
+            cand = self._rows(collection, idx) @ q
+            order = np.argsort(-cand)
+            return [
+                self._document(collection, i, float(cand[j])) for j, i in zip(order, idx[order])
+            ]
+
+        # 정규화된 벡터끼리의 내적 = 코사인 유사도, 전체 점수를 한 번의 SGEMV로 계산
+        if collection["quantize"]:
+            scores = _int8_dot(matrix, collection["scales"][:size], q)
+        else:
+            scores = matrix @ q
+
+        # 상위 k개만 O(N) 선택 후 그 k개만 정렬
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+        return [self._document(collection, i, float(scores[i])) for i in idx]
+
+    async def persist(self, collection_name: str):
+        """컬렉션을 db_path에 저장 (faiss 인덱스 + 임베딩 .npz + 문서 JSON)"""
+        collection = self.collections.get(collection_name)
+        if collection is None:
+            return
+        base = os.path.join(self.db_path, collection_name)
+        if collection["index"] is not None:
+            self._faiss.write_index(collection["index"], f"{base}.faiss")
+        if collection["size"]:
+            size = collection["size"]
+            arrays = {"matrix": collection["matrix"][:size]}
+            if collection["quantize"]:
+                arrays["scales"] = collection["scales"][:size]
+            np.savez(f"{base}.npz", **arrays)
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "metadata": collection["metadata"],
+                    "index_type": collection["index_type"],
+                    "quantize": collection["quantize"],
+                    "ids": collection["ids"],
+                    "contents": collection["contents"],
+                    "metadatas": collection["metadatas"],
+                },
+                f,
+                ensure_ascii=False,
+            )
+
+
+# 임베딩 모델 한 번의 forward(원격 API면 한 번의 요청)에 넣는 입력 수
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+# 원격 임베딩 API 동시 요청 수
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "8"))
 
 
 class EmbeddingModel:
-    """임베딩 모델 클래스"""
+    """임베딩 모델 클래스 (text-embedding-* 이름이면 OpenAI API, 그 외 sentence-transformers)"""
 
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
         self.model_name = model_name
         self.model = None
+        self.client = None
 
     async def initialize(self):
-        """임베딩 모델 초기화"""
+        """임베딩 모델 초기화 (sentence-transformers가 없으면 임시 랜덤 벡터 사용)"""
         try:
-            # TODO: 실제 임베딩 모델 로드
+            if self.model_name.startswith("text-embedding-"):
+                from openai import AsyncOpenAI
+
+                self.client = AsyncOpenAI()
+                print(f"원격 임베딩 모델 사용: {self.model_name}")
+                return True
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                print("sentence-transformers 미설치: 임시 랜덤 임베딩을 사용합니다.")
+                return True
+            self.model = await asyncio.to_thread(SentenceTransformer, self.model_name)
             print(f"임베딩 모델 로드됨: {self.model_name}")
             return True
         except Exception as e:
@@ -74,16 +319,42 @@ class EmbeddingModel:
 
     async def embed_text(self, text: str) -> List[float]:
         """텍스트 임베딩"""
-        # TODO: 실제 임베딩 생성
-        # 임시로 랜덤 벡터 반환
-        import random
-
-        return [random.random() for _ in range(384)]
+        return (await self.embed_texts([text]))[0]
 
     async def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        """여러 텍스트 임베딩"""
-        embeddings = []
-        for text in texts:
-            embedding = await self.embed_text(text)
-            embeddings.append(embedding)
-        return embeddings
+        """여러 텍스트 임베딩 (모델 한 번 호출로 배치 처리)"""
+        if not texts:
+            return []
+        if self.client is not None:
+            return await self._embed_remote(texts)
+        if self.model is None:
+            # 임시로 랜덤 벡터 반환
+            import random
+
+            return [[random.random() for _ in range(384)] for _ in texts]
+
+        # encode는 내부에서 길이순 정렬 후 배치를 구성해 패딩 낭비를 줄이고 원래 순서로 돌려줌
+        vectors = await asyncio.to_thread(
+            self.model.encode,
+            texts,
+            batch_size=EMBED_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return vectors.tolist()
+
+    async def _embed_remote(self, texts: List[str]) -> List[List[float]]:
+        """원격 API: EMBED_BATCH_SIZE 단위 요청을 EMBED_CONCURRENCY개까지 동시에 전송"""
+        batches = [
+            texts[i : i + EMBED_BATCH_SIZE] for i in range(0, len(texts), EMBED_BATCH_SIZE)
+        ]
+        sem = asyncio.Semaphore(max(1, EMBED_CONCURRENCY))
+
+        async def bounded(batch: List[str]) -> List[List[float]]:
+            async with sem:
+                resp = await self.client.embeddings.create(model=self.model_name, input=batch)
+                return [d.embedding for d in resp.data]
+
+        # gather는 입력 순서대로 결과를 돌려주므로 그대로 펼치면 순서 유지
+        results = await asyncio.gather(*(bounded(b) for b in batches))
+        return [emb for batch_embs in results for emb in batch_embs]